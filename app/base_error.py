@@ -5,8 +5,12 @@ class BaseError:
     error: HTTPException
     example: dict
 
-    def __init__(self, status_code: int, detail: str):
-        self.error = HTTPException(status_code=status_code, detail=detail)
+    def __init__(
+        self, status_code: int, detail: str, headers: dict[str, str] | None = None
+    ):
+        self.error = HTTPException(
+            status_code=status_code, detail=detail, headers=headers
+        )
         self.example = {"detail": detail}
 
 
@@ -18,3 +22,34 @@ class NotFoundError(BaseError):
         self.example = {
             "detail": detail,
         }
+
+
+class BadRequestError(BaseError):
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+        self.example = {
+            "detail": detail,
+        }
+
+
+class UnsupportedMediaTypeError(BaseError):
+    def __init__(self, detail: str = "Unsupported media type"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=detail
+        )
+
+        self.example = {
+            "detail": detail,
+        }
+
+
+class NotModifiedError(BaseError):
+    def __init__(self, etag: str = '"etag"'):
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            detail="Not modified",
+            headers={"ETag": etag},
+        )
+
+        self.example = {}
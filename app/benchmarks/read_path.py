@@ -0,0 +1,156 @@
+"""
+Benchmark of the read path of the list endpoints, comparing the CPU time per page of the previous path (documents
+hydrated by Beanie, copied into LogRetrieveSchema, validated against the response model and encoded by the json module)
+with the current one (records rendered straight to JSON by orjson, within a prebuilt envelope).
+
+Both paths read the same page (newest logs first) with the query of their own; the query is not timed, so that
+the CPU time only covers what happens to the records once they are read (it is reported apart, as wall time).
+It seeds `--logs` logs into a dedicated database (`<DB_NAME>_benchmark` by default), which is dropped afterwards.
+Run it from the app directory with:
+
+    python -m benchmarks.read_path [--logs 10000] [--page-size 100] [--pages 50] [--payload-size 512]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Callable, Optional
+from beanie.odm.utils.parsing import parse_obj
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from logs.models import Level, Log
+from logs.responses import LogReadListResponse
+from logs.schemas import LogRetrieveSchema
+from negotiation import NegotiatedJSONResponse
+from repositories.mongo_repository import (
+    MongoLogRepository,
+    _log_from_record,
+    get_log_document,
+)
+from settings import settings
+
+_response_adapter = TypeAdapter(LogReadListResponse[list[LogRetrieveSchema]])
+
+
+async def seed(count: int, payload_size: int, batch_size: int = 1000) -> None:
+    repo = MongoLogRepository()
+    levels = list(Level)
+    for start in range(0, count, batch_size):
+        await repo.insert_many(
+            [
+                Log(
+                    tenant=f"tenant-{index % 10}",
+                    log={"event": "benchmark", "payload": "x" * payload_size},
+                    metadata={"index": index, "host": f"host-{index % 50}"},
+                    tag=f"tag-{index % 20}",
+                    level=levels[index % len(levels)],
+                    group_path=["benchmark", f"group-{index % 5}"],
+                )
+                for index in range(start, min(start + batch_size, count))
+            ]
+        )
+
+
+async def _read(offset: int, limit: int, projection: Optional[dict]) -> list[dict]:
+    return (
+        await get_log_document()
+        .get_motor_collection()
+        .find({}, projection)
+        .sort([("created_at", -1), ("uid", -1)])
+        .skip(offset)
+        .limit(limit)
+        .to_list(limit)
+    )
+
+
+def previous_page(raws: list[dict]) -> bytes:
+    document = get_log_document()
+    logs = [parse_obj(document, raw).to_log() for raw in raws]
+    response = LogReadListResponse(
+        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=None
+    )
+    # as FastAPI does with the returned model: validated and dumped by the response model, then encoded
+    content = _response_adapter.dump_python(
+        _response_adapter.validate_python(response), mode="json"
+    )
+    return JSONResponse(content).body
+
+
+def current_page(raws: list[dict]) -> bytes:
+    document = get_log_document()
+    logs = [_log_from_record(document.to_record(raw)) for raw in raws]
+    return NegotiatedJSONResponse(LogReadListResponse.content(logs, None)).body
+
+
+async def _measure(
+    render_page: Callable[[list[dict]], bytes],
+    projection: Optional[dict],
+    page_size: int,
+    pages: int,
+    total_logs: int,
+) -> dict:
+    render_page(await _read(0, page_size, projection))  # warm up
+    cpu = query = 0.0
+    size = 0
+    for page in range(pages):
+        offset = (page * page_size) % max(total_logs - page_size, 1)
+        started = time.perf_counter()
+        raws = await _read(offset, page_size, projection)
+        query += time.perf_counter() - started
+
+        started = time.process_time()
+        size += len(render_page(raws))
+        cpu += time.process_time() - started
+    return {
+        "cpu_ms_per_page": round(cpu * 1000 / pages, 3),
+        "query_ms_per_page": round(query * 1000 / pages, 3),
+        "bytes_per_page": size // pages,
+    }
+
+
+async def benchmark(page_size: int = 100, pages: int = 50, total_logs: int = 0) -> dict:
+    """
+    Returns the CPU time per page of both paths, along with the wall time of their queries, over the logs already stored.
+    """
+    # the previous path read whole documents, the current one leaves the internal fields out
+    previous = await _measure(previous_page, None, page_size, pages, total_logs)
+    current = await _measure(
+        current_page,
+        MongoLogRepository()._projection(),
+        page_size,
+        pages,
+        total_logs,
+    )
+    return {
+        "previous": previous,
+        "current": current,
+        "cpu_speedup": round(
+            previous["cpu_ms_per_page"] / max(current["cpu_ms_per_page"], 1e-6), 2
+        ),
+    }
+
+
+async def main(args: argparse.Namespace):
+    from database import init_db
+
+    await init_db(db_name=args.db_name, index_build="foreground")
+    collection = get_log_document().get_motor_collection()
+    try:
+        await seed(args.logs, args.payload_size)
+        report = await benchmark(args.page_size, args.pages, args.logs)
+        print(json.dumps(report, indent=2))
+    finally:
+        await collection.database.client.drop_database(args.db_name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the CPU time per page of the previous and the current read paths."
+    )
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--payload-size", type=int, default=512)
+    parser.add_argument("--db-name", default=f"{settings.DB_NAME}_benchmark")
+    asyncio.run(main(parser.parse_args()))
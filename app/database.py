@@ -1,20 +1,33 @@
 import logging
+from typing import Literal
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from repositories.mongo_repository import MongoLogDocument
+from repositories.mongo_repository import get_log_document, refresh_available_indexes
+from repositories.indexes import build_indexes_in_background
+from repositories.rollups import MongoRollupDocument
 from settings import settings
 
 
 
 async def init_db(
-    db_address: str = settings.DB_ADDRESS, db_name: str = settings.DB_NAME
+    db_address: str = settings.DB_ADDRESS,
+    db_name: str = settings.DB_NAME,
+    index_build: Literal["foreground", "background", "skip"] = settings.DB_INDEX_BUILD,
 ):
     try:
         client = AsyncIOMotorClient(db_address)
         # db = client[db_name]
         db = client.get_database(db_name)
-        await init_beanie(database=db, document_models=[MongoLogDocument])
+        await init_beanie(
+            database=db,
+            document_models=[get_log_document(), MongoRollupDocument],
+            skip_indexes=index_build != "foreground",
+        )
+        # the background build records the indexes again once they are built
+        await refresh_available_indexes()
+        if index_build == "background":
+            build_indexes_in_background()
         logging.info(
             "✅ Database initialized successfully.", "\n", f"db_name: {db_name}"
         )
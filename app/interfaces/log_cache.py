@@ -0,0 +1,29 @@
+# interfaces/log_cache.py
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Tuple
+from logs.models import Log
+
+
+class AbstractLogCache(ABC):
+    """
+    Cache of the logs by uid, in front of the repository; logs are never updated once stored, so the cached ones never go stale.
+    Implementations may keep the logs in-process, or share them between processes (e.g. through Redis).
+    """
+
+    @abstractmethod
+    async def get(self, uid: str) -> Tuple[bool, Optional[Log]]:
+        """
+        Returns whether the uid is cached, and its log; the log is None if the uid is known not to exist.
+        """
+
+    @abstractmethod
+    async def set_many(self, logs: Iterable[Log]) -> None: ...
+
+    @abstractmethod
+    async def set_missing(self, uid: str) -> None:
+        """
+        Remember, briefly, that no log has this uid; storing the log must override it.
+        """
+
+    @abstractmethod
+    def stats(self) -> dict: ...
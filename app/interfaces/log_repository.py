@@ -1,7 +1,11 @@
 # interfaces/log_repository.py
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Tuple
 from logs.models import Log, Level
+from logs.filters import LogFilter
+from logs.stats import RollupGranularity, StatsDimension
+from logs.pagination import CountMode, LogCursor
 
 
 class AbstractLogRepository(ABC):
@@ -9,19 +13,120 @@ class AbstractLogRepository(ABC):
     async def insert(self, log: Log) -> None: ...
 
     @abstractmethod
-    async def get(self, uid: str) -> Optional[Log]: ...
+    async def insert_many(self, logs: List[Log]) -> Dict[int, str]:
+        """
+        Persist all the given logs with a single (unordered) bulk write; a failing record must not prevent
+        the others from being stored. Returns the failed records as a mapping of their index in `logs` to the reason.
+        """
 
     @abstractmethod
-    async def all(self) -> List[Log]: ...
+    async def get(self, uid: str, fields: Optional[List[str]] = None) -> Optional[Log]:
+        """
+        If `fields` is given, the log may hold only these fields (see below).
+        """
+
+    # The following methods return a page of logs along with the total number of matching logs.
+    # Pages are selected by `offset` and `limit` or, if a cursor is given, by keyset pagination
+    # (newest first, starting right after the cursor; the `offset` is ignored).
+    # Depending on `count`, the total is exact, an EstimatedCount or None (not counted).
+    # If `fields` is given, only these fields (along with the `uid` and the `created_at`, which identify the pages)
+    # need to be read; the logs are then partial (built with `Log.model_construct`).
+
+    @abstractmethod
+    async def all(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
+
+    @abstractmethod
+    async def find_by_tag(
+        self,
+        tag: str,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
+
+    @abstractmethod
+    async def find_by_level(
+        self,
+        level: Level,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
+
+    @abstractmethod
+    async def find_by_group_path(
+        self,
+        group_path: List[str],
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
+
+    @abstractmethod
+    async def find_children_by_group_path(
+        self,
+        group_path: List[str],
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
 
     @abstractmethod
-    async def find_by_tag(self, tag: str) -> List[Log]: ...
+    async def search(
+        self,
+        filters: LogFilter,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]: ...
 
     @abstractmethod
-    async def find_by_level(self, level: Level) -> List[Log]: ...
+    async def version(
+        self, filters: LogFilter, count: CountMode = CountMode.EXACT
+    ) -> Hashable:
+        """
+        Returns a value that changes whenever a log matching the filters is stored, whatever its `created_at`
+        (logs are never updated); it should be answered from a cache as long as possible, rather than the database,
+        and should not cost more than counting the logs with `count`.
+        """
 
     @abstractmethod
-    async def find_by_group_path(self, group_path: List[str]) -> List[Log]: ...
+    def export(self, filters: LogFilter) -> AsyncIterator[dict]:
+        """
+        Yields all the logs matching the filters, newest first, as plain dicts with the fields of the Log;
+        they must be streamed from the database, rather than loaded at once.
+        """
 
     @abstractmethod
-    async def find_children_by_group_path(self, group_path: List[str]) -> List[Log]: ...
+    async def stats(
+        self,
+        granularity: RollupGranularity,
+        since: datetime,
+        until: datetime,
+        tenant: Optional[str] = None,
+        levels: Optional[List[Level]] = None,
+        tag: Optional[str] = None,
+        group_root: Optional[str] = None,
+        by: Optional[StatsDimension] = None,
+    ) -> List[dict]:
+        """
+        Returns the number of logs per time bucket in [since, until), broken down by the `by` dimension if given,
+        as {"bucket", "key", "count"} items ordered by bucket; the empty buckets are omitted.
+        """
@@ -0,0 +1,68 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from logs.errors import TooManyRequestsError
+from settings import settings
+
+
+class AdmissionController:
+    """
+    Keeps the latency of the ingest endpoints bounded when the backend slows down: the work in flight is tracked
+    per ingest path and, once a path is above its watermark, new requests are rejected with 429 (and a Retry-After header)
+    instead of piling up in memory.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        buffer_high_watermark: int = settings.ADMISSION_BUFFER_HIGH_WATERMARK,
+        retry_after: int = settings.ADMISSION_RETRY_AFTER,
+    ):
+        self.limits = limits or {
+            "sync": settings.ADMISSION_SYNC_MAX_IN_FLIGHT,
+            "batch": settings.ADMISSION_BATCH_MAX_IN_FLIGHT,
+            "ndjson": settings.ADMISSION_NDJSON_MAX_IN_FLIGHT,
+            "non_blocking": settings.ADMISSION_NON_BLOCKING_MAX_IN_FLIGHT,
+        }
+        self.buffer_high_watermark = buffer_high_watermark
+        self.retry_after = retry_after
+        self.in_flight: dict[str, int] = defaultdict(int)
+        self.rejected: dict[str, int] = defaultdict(int)
+
+    def _reject(self, path: str):
+        self.rejected[path] += 1
+        raise TooManyRequestsError(retry_after=self.retry_after).error
+
+    @contextmanager
+    def admit(self, path: str, weight: int = 1):
+        """
+        Admits `weight` units of work (e.g. the number of logs of a batch) on the given path, for the duration of the block.
+        A request is always admitted when nothing is in flight, so that a single oversized batch cannot be starved.
+        """
+        if self.in_flight[path] and self.in_flight[path] + weight > self.limits[path]:
+            self._reject(path)
+
+        self.in_flight[path] += weight
+        try:
+            yield
+        finally:
+            self.in_flight[path] -= weight
+
+    def admit_buffered(self, pending: int):
+        if pending >= self.buffer_high_watermark:
+            self._reject("builtin")
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": dict(self.in_flight),
+            "rejected": dict(self.rejected),
+        }
+
+
+_admission_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
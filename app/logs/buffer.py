@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from collections import deque
+from interfaces.log_repository import AbstractLogRepository
+from logs.models import Log
+from queues.spool import DiskSpool, get_spool
+from settings import settings
+
+
+class LogWriteBuffer:
+    """
+    In-process write-behind buffer, used by the builtin non-blocking endpoint.
+
+    Logs are kept in memory (at most `max_size` of them) and are written to the repository in bulk,
+    as soon as `batch_size` logs are pending or every `flush_interval` seconds, whichever comes first.
+    Once the buffer is full, new logs are rejected (and counted as dropped) instead of growing the memory unbounded.
+    If a spool is given, the logs that could not be written to the repository are spooled to the disk instead of being lost.
+    """
+
+    def __init__(
+        self,
+        repo: AbstractLogRepository,
+        max_size: int = settings.BUFFER_MAX_SIZE,
+        batch_size: int = settings.BUFFER_BATCH_SIZE,
+        flush_interval: float = settings.BUFFER_FLUSH_INTERVAL,
+        spool: DiskSpool | None = None,
+    ):
+        self.repo = repo
+        self.spool = spool
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: deque[Log] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spooled = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, log: Log) -> bool:
+        """
+        Buffer a log to be written later; returns False if the buffer is full and the log is dropped.
+        """
+        if len(self._pending) >= self.max_size:
+            self.dropped += 1
+            return False
+
+        self._pending.append(log)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._pending:
+                batch = [
+                    self._pending.popleft()
+                    for _ in range(min(self.batch_size, len(self._pending)))
+                ]
+                try:
+                    failed = await self.repo.insert_many(batch)
+                except asyncio.CancelledError:
+                    # keep the batch, so that it is written by the final flush on shutdown
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                except Exception:
+                    logging.exception(f"❌ Failed to flush {len(batch)} buffered logs.")
+                    if self.spool is not None and await asyncio.to_thread(
+                        self.spool.append, [log.model_dump() for log in batch]
+                    ):
+                        self.spooled += len(batch)
+                    else:
+                        self.failed += len(batch)
+                    continue
+
+                self.flushed += len(batch) - len(failed)
+                self.failed += len(failed)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the periodic flushing and write whatever is still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "capacity": self.max_size,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "spooled": self.spooled,
+        }
+
+
+_log_buffer: LogWriteBuffer | None = None
+
+
+def get_log_buffer() -> LogWriteBuffer:
+    global _log_buffer
+    if _log_buffer is None:
+        from repositories.mongo_repository import MongoLogRepository
+
+        _log_buffer = LogWriteBuffer(MongoLogRepository(), spool=get_spool())
+    return _log_buffer
@@ -12,3 +12,30 @@ class ServiceUnavailableError(BaseError):
         self.example = {
             "detail": detail,
         }
+
+
+class PayloadTooLargeError(BaseError):
+    def __init__(self, detail: str = "Too many logs in a single batch."):
+        super().__init__(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=detail,
+        )
+
+        self.example = {
+            "detail": detail,
+        }
+
+
+class TooManyRequestsError(BaseError):
+    def __init__(
+        self, detail: str = "Too many logs in flight; retry later.", retry_after: int = 1
+    ):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+        self.example = {
+            "detail": detail,
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from typing import Iterable, Optional
+from logs.filters import LogFilter
+from logs.models import Log
+from settings import settings
+
+
+def log_matches(filters: LogFilter, log: Log) -> bool:
+    """
+    Whether the log satisfies the tenant, levels, tag and group path (prefix) predicates of the filters.
+    """
+    if filters.tenant is not None and log.tenant != filters.tenant:
+        return False
+    if filters.levels and log.level not in filters.levels:
+        return False
+    if filters.tag is not None and log.tag != filters.tag:
+        return False
+    if filters.group_path:
+        prefix = log.group_path[: len(filters.group_path)] if log.group_path else None
+        if prefix != filters.group_path:
+            return False
+    return True
+
+
+class LogSubscription:
+    """
+    Logs published since the subscription, matching its filters, in a queue of at most `max_size` logs.
+    A subscriber that falls `max_size` logs behind is dropped, rather than slowing the publishers down or growing the memory.
+    """
+
+    def __init__(self, filters: LogFilter, max_size: int):
+        self.filters = filters
+        self.dropped = False
+        self._queue: asyncio.Queue[Log | None] = asyncio.Queue(max_size)
+
+    def offer(self, log: Log) -> bool:
+        """
+        Returns False if the queue is full, in which case the subscription is marked as dropped.
+        """
+        try:
+            self._queue.put_nowait(log)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            # make room for the end of stream marker; the pending logs would not be read anyway
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Log]:
+        """
+        Waits for the next log; returns None once the subscription is dropped.
+        Raises `asyncio.TimeoutError` if no log was published within `timeout` seconds.
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class LogEventBus:
+    """
+    In-process publish/subscribe of the stored logs, feeding the live tail.
+
+    Every insertion of the repository publishes the stored logs, and each one is handed to the subscriptions whose filters
+    it matches. Publishing never waits: slow subscribers are dropped instead (see `LogSubscription`).
+    At most `max_subscribers` subscriptions are accepted at once.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.TAIL_QUEUE_SIZE,
+        max_subscribers: int = settings.TAIL_MAX_SUBSCRIBERS,
+    ):
+        self.max_queue_size = max_queue_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions: set[LogSubscription] = set()
+
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscribers
+
+    def subscribe(self, filters: LogFilter) -> Optional[LogSubscription]:
+        """
+        Returns None if there are too many subscriptions already.
+        """
+        if self.is_full:
+            return None
+        subscription = LogSubscription(filters, self.max_queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, logs: Iterable[Log]) -> None:
+        if not self._subscriptions:
+            return
+        for log in logs:
+            self.published += 1
+            for subscription in list(self._subscriptions):
+                if not log_matches(subscription.filters, log):
+                    continue
+                if not subscription.offer(log):
+                    self.unsubscribe(subscription)
+                    self.dropped_subscribers += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+class ChangeStreamPublisher:
+    """
+    Publishes the logs inserted by any process (e.g. other workers, the celery worker or the queue consumer)
+    to the bus, by watching the change stream of the logs collection; change streams need a replica set
+    and are not available on time-series collections. On failure, the stream is resumed after `retry_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        bus: LogEventBus,
+        document,
+        retry_interval: float = settings.TAIL_CHANGE_STREAM_RETRY_INTERVAL,
+    ):
+        self.bus = bus
+        self.document = document
+        self.retry_interval = retry_interval
+        self._task: asyncio.Task | None = None
+        self._resume_token = None
+
+    async def _watch(self) -> None:
+        collection = self.document.get_motor_collection()
+        async with collection.watch(
+            [
+                {"$match": {"operationType": "insert"}},
+                # the fields of the Log only, as `to_record` expects
+                {
+                    "$project": {
+                        "fullDocument._id": 0,
+                        "fullDocument.group_ancestors": 0,
+                        "fullDocument.search_text": 0,
+                    }
+                },
+            ],
+            resume_after=self._resume_token,
+        ) as stream:
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                record = self.document.to_record(change["fullDocument"])
+                self.bus.publish([Log(**record)])
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("❌ The change stream of the logs failed.")
+            await asyncio.sleep(self.retry_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_event_bus: LogEventBus | None = None
+
+
+def get_event_bus() -> LogEventBus:
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = LogEventBus()
+    return _event_bus
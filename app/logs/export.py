@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from enum import StrEnum
+from typing import AsyncIterator, Iterable
+from settings import settings
+
+EXPORT_FIELDS = (
+    "uid",
+    "created_at",
+    "tenant",
+    "level",
+    "tag",
+    "group_path",
+    "log",
+    "metadata",
+    "execution_path",
+)
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self == ExportFormat.NDJSON else "text/csv"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def _ndjson_lines(records: Iterable[dict]) -> str:
+    return "".join(
+        _dumps({field: record.get(field) for field in EXPORT_FIELDS}) + "\n"
+        for record in records
+    )
+
+
+def _csv_value(field: str, value):
+    if value is None:
+        return ""
+    if field == "group_path":
+        return "-".join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return _dumps(value)
+    return value
+
+
+def _csv_lines(records: Iterable[dict], header: bool = False) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for record in records:
+        writer.writerow(
+            [_csv_value(field, record.get(field)) for field in EXPORT_FIELDS]
+        )
+    return output.getvalue()
+
+
+async def render_export(
+    records: AsyncIterator[dict],
+    export_format: ExportFormat,
+    compress: bool = False,
+    chunk_size: int = settings.EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Renders the records as NDJSON or CSV (optionally gzip-compressed) chunks of about `chunk_size` bytes,
+    as they come, so that the memory used does not depend on the number of records.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    render = _ndjson_lines if export_format == ExportFormat.NDJSON else _csv_lines
+    pending: list[dict] = []
+    pending_size = 0
+
+    def encode(data: str) -> bytes:
+        data = data.encode()
+        return compressor.compress(data) if compressor is not None else data
+
+    if export_format == ExportFormat.CSV:
+        yield encode(_csv_lines([], header=True))
+
+    async for record in records:
+        pending.append(record)
+        # a rough estimate of the rendered size, so that records are rendered in batches
+        pending_size += len(str(record))
+        if pending_size >= chunk_size:
+            if chunk := encode(render(pending)):
+                yield chunk
+            pending, pending_size = [], 0
+
+    data = encode(render(pending)) if pending else b""
+    if compressor is not None:
+        data += compressor.flush()
+    if data:
+        yield data
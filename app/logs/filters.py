@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+from logs.models import Level
+
+
+class LogFilter(NamedTuple):
+    """
+    Combination of predicates used to search logs; the predicates that are None (or empty) are not applied.
+    """
+
+    tenant: Optional[str] = None
+    levels: Optional[List[Level]] = None  # any of these levels
+    tag: Optional[str] = None
+    group_path: Optional[List[str]] = None  # the group and all the groups under it
+    created_from: Optional[datetime] = None  # inclusive
+    created_to: Optional[datetime] = None  # exclusive
+    text: Optional[str] = None  # full-text search over the payload and the metadata
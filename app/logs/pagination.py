@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from enum import StrEnum
+from typing import NamedTuple, Optional
+from base_error import BadRequestError
+from logs.models import Log
+
+
+class CountMode(StrEnum):
+    """
+    How the total of a list of logs is computed: counted exactly, estimated (cheaper on large collections) or not at all.
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class EstimatedCount(int):
+    """
+    A total that was estimated rather than counted: either taken from the collection metadata,
+    or a bounded count, meaning that at least that many logs match (e.g. "10000+").
+    """
+
+
+class LogCursor(NamedTuple):
+    """
+    Position of a log in the keyset order used by cursor pagination (newest first, by `created_at` then `uid`).
+    The cursor of the first page carries no position.
+    """
+
+    created_at: Optional[datetime] = None
+    uid: Optional[str] = None
+
+    @property
+    def is_first_page(self) -> bool:
+        return self.created_at is None
+
+    def encode(self) -> str:
+        payload = json.dumps([self.created_at.isoformat(), self.uid]).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "LogCursor":
+        """
+        Decodes an opaque cursor, as returned in `next_cursor`; an empty cursor stands for the first page.
+        """
+        if not cursor:
+            return cls()
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            )
+            if not (
+                isinstance(payload, list)
+                and len(payload) == 2
+                and all(isinstance(item, str) for item in payload)
+            ):
+                raise ValueError("A cursor holds the creation time and the uid of a log.")
+            created_at, uid = payload
+            return cls(datetime.fromisoformat(created_at), uid)
+        except (ValueError, TypeError):
+            raise BadRequestError("Invalid cursor.").error
+
+    @classmethod
+    def from_log(cls, log: Log) -> "LogCursor":
+        return cls(log.created_at, log.uid)
+
+
+def next_cursor(logs: list[Log], limit: int, cursor: Optional[str]) -> Optional[str]:
+    """
+    Returns the cursor of the page following `logs`, in cursor mode (i.e. when a cursor was given) and if there may be more logs.
+    """
+    if cursor is None or not logs or len(logs) < limit:
+        return None
+    return LogCursor.from_log(logs[-1]).encode()
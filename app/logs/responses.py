@@ -1,5 +1,12 @@
+from typing import Optional
 from base_response import BaseResponse
-from logs.schemas import LogRetrieveSchema
+from logs.models import Log
+from logs.pagination import EstimatedCount
+from logs.schemas import (
+    LogRetrieveSchema,
+    LogBatchItemStatusSchema,
+    LogStatsBucketSchema,
+)
 
 
 class LogCreateResponse(BaseResponse):
@@ -11,6 +18,10 @@ class LogCreateResponse(BaseResponse):
         super().__init__(message=message, data=data)
 
 
+def _record(log: Log, fields: Optional[list[str]] = None) -> dict:
+    return log.model_dump(include=set(fields) if fields is not None else None)
+
+
 class LogReadResponse(BaseResponse):
     def __init__(
         self,
@@ -19,19 +30,97 @@ class LogReadResponse(BaseResponse):
     ):
         super().__init__(message=message, data=data)
 
+    @classmethod
+    def content(
+        cls,
+        log: Log,
+        fields: Optional[list[str]] = None,
+        message: str = "Log retrieved successfully",
+    ) -> dict:
+        """
+        Content of the response, built straight from a log of the repository (see `LogReadListResponse.content`).
+        """
+        return {"message": message, "data": _record(log, fields)}
+
 
 class LogReadListResponse(BaseResponse):
-    total: int
+    total: Optional[int]
+    total_exact: bool = True
+    next_cursor: Optional[str] = None
 
     def __init__(
         self,
         data: list[LogRetrieveSchema],
         message: str = "Logs retrieved successfully",
-        total: int = 0,
+        total: Optional[int] = 0,
+        next_cursor: Optional[str] = None,
+        total_exact: Optional[bool] = None,
     ):
-        super().__init__(message=message, data=data, total=total)
+        if total_exact is None:
+            total_exact = total is not None and not isinstance(total, EstimatedCount)
+        super().__init__(
+            message=message,
+            data=data,
+            total=total,
+            total_exact=total_exact,
+            next_cursor=next_cursor,
+        )
         self.total = total
 
+    @classmethod
+    def content(
+        cls,
+        logs: list[Log],
+        total: Optional[int] = 0,
+        next_cursor: Optional[str] = None,
+        fields: Optional[list[str]] = None,
+        message: str = "Logs retrieved successfully",
+    ) -> dict:
+        """
+        Content of the response, built straight from the logs of the repository: they were validated when stored,
+        therefore they are neither copied into LogRetrieveSchema nor validated again against the response model;
+        given `fields`, only these fields of the logs are rendered.
+        """
+        return {
+            "message": message,
+            "data": [_record(log, fields) for log in logs],
+            "total": total,
+            "total_exact": total is not None and not isinstance(total, EstimatedCount),
+            "next_cursor": next_cursor,
+        }
+
+
+class LogBatchCreateResponse(BaseResponse):
+    accepted: int
+    rejected: int
+
+    def __init__(
+        self,
+        data: list[LogBatchItemStatusSchema],
+        message: str = "Logs batch processed",
+        accepted: int = 0,
+        rejected: int = 0,
+    ):
+        super().__init__(
+            message=message, data=data, accepted=accepted, rejected=rejected
+        )
+
+
+class LogStreamCreateResponse(BaseResponse):
+    accepted: int
+    rejected: int
+
+    def __init__(
+        self,
+        data: list[int],
+        message: str = "Logs stream processed",
+        accepted: int = 0,
+        rejected: int = 0,
+    ):
+        super().__init__(
+            message=message, data=data, accepted=accepted, rejected=rejected
+        )
+
 
 class NonBlockingLogCreateResponse(BaseResponse):
     def __init__(
@@ -40,3 +129,21 @@ class NonBlockingLogCreateResponse(BaseResponse):
         message: str = "Log creation queued successfully",
     ):
         super().__init__(message=message, data=data)
+
+
+class LogStatsResponse(BaseResponse):
+    def __init__(
+        self,
+        data: list[LogStatsBucketSchema],
+        message: str = "Statistics retrieved successfully",
+    ):
+        super().__init__(message=message, data=data)
+
+
+class MetricsResponse(BaseResponse):
+    def __init__(
+        self,
+        data: dict,
+        message: str = "Metrics retrieved successfully",
+    ):
+        super().__init__(message=message, data=data)
@@ -1,41 +1,140 @@
-from fastapi import APIRouter, Depends, status, BackgroundTasks
+from datetime import datetime
+from typing import Annotated
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from queues.celery_worker import celery_app
-from logs.schemas import LogCreateSchema, LogRetrieveSchema
+from logs.schemas import (
+    LogCreateSchema,
+    LogRetrieveSchema,
+    LogBatchItemStatusSchema,
+    LogSearchSchema,
+    LogStatsBucketSchema,
+    parse_fields,
+)
 from logs.models import Level
 from interfaces.log_repository import AbstractLogRepository
 from celery import Celery
 from logs.services import (
     create_log,
+    create_logs,
+    create_logs_stream,
+    create_log_buffered,
     read_log,
+    read_log_etag,
+    read_logs_etag,
+    check_not_modified,
+    search_filter,
     read_logs_list,
     read_logs_by_level,
     read_logs_by_tag,
     read_logs_by_group_path,
     read_logs_by_group_path_children,
+    read_logs_search,
+    read_stats,
+    export_logs,
+    tail_logs,
     create_log_non_blocking,
+    create_logs_non_blocking,
 )
 
-from base_error import NotFoundError
-from logs.errors import ServiceUnavailableError
-from tasks import _save_log
+from base_error import BadRequestError, NotFoundError
+from logs.filters import LogFilter
+from logs.errors import (
+    ServiceUnavailableError,
+    PayloadTooLargeError,
+    TooManyRequestsError,
+)
+from logs.admission import AdmissionController, get_admission_controller
+from logs.buffer import LogWriteBuffer, get_log_buffer
+from logs.pagination import CountMode, next_cursor
+from logs.export import ExportFormat
+from logs.events import LogEventBus, get_event_bus
+from repositories.log_cache import get_log_cache
+from repositories.result_cache import get_result_cache
+from logs.stats import RollupGranularity, StatsDimension
+from negotiation import NegotiatedJSONResponse, NegotiatedRoute, negotiate_media_type
+from queues.health import get_broker_monitor
+from queues.spool import get_spool
+from settings import settings
 from logs.responses import (
     LogCreateResponse,
+    LogBatchCreateResponse,
+    LogStreamCreateResponse,
     LogReadResponse,
     LogReadListResponse,
     NonBlockingLogCreateResponse,
+    LogStatsResponse,
+    MetricsResponse,
 )
 
-logging_router = APIRouter()
+not_modified_response = {
+    "description": "The copy of the client, as identified by its If-None-Match header, is current.",
+}
+
+too_many_requests_response = {
+    "description": "The ingest path is overloaded; retry after the number of seconds given by the Retry-After header.",
+    "content": {"application/json": {"example": TooManyRequestsError().example}},
+}
+
+class ConditionalGet:
+    """
+    Conditional GET of the read endpoints: sets the ETag of the response, or answers with a 304 Not Modified
+    (without running the query) if it matches the If-None-Match header of the request.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        if_none_match: Annotated[str | None, Header()] = None,
+    ):
+        self.response = response
+        self.if_none_match = if_none_match
+        self.page = f"{request.url.path}?{request.url.query}"
+        self.media_type = negotiate_media_type(request.headers.get("accept"))
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """
+        Headers to give to the responses returned directly, rather than built by FastAPI.
+        """
+        return dict(self.response.headers)
+
+    def _check(self, etag: str) -> None:
+        check_not_modified(etag, self.if_none_match)
+        self.response.headers["ETag"] = etag
+
+    def log(self, uid: str, fields: list[str] | None = None) -> None:
+        self._check(read_log_etag(uid, self.media_type, fields))
+
+    async def logs(
+        self,
+        repo: AbstractLogRepository,
+        filters: LogFilter,
+        count: CountMode = CountMode.EXACT,
+    ) -> None:
+        self._check(
+            await read_logs_etag(repo, filters, self.page, self.media_type, count)
+        )
+
+
+logging_router = APIRouter(
+    route_class=NegotiatedRoute, default_response_class=NegotiatedJSONResponse
+)
 
 
-def get_repository() -> AbstractLogRepository:
+def get_repository(
+    cache_control: Annotated[str | None, Header()] = None,
+) -> AbstractLogRepository:
     """
     If you are adding support for another database, you are supposed to return the corresponding repository instead of MongoLogRepository;
     make sure that your repository implements the AbstractLogRepository interface properly.
+    Requests sent with `Cache-Control: no-cache` bypass the cached results of the list endpoints.
     """
     from repositories.mongo_repository import MongoLogRepository
 
-    return MongoLogRepository()
+    no_cache = cache_control is not None and "no-cache" in cache_control.lower()
+    return MongoLogRepository(cache_results=not no_cache)
 
 
 def get_celery_app():
@@ -46,61 +145,364 @@ def get_celery_app():
     "/",
     response_model=LogCreateResponse[LogRetrieveSchema],
     status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response},
 )
 async def post_log(
-    record: LogCreateSchema, repo: AbstractLogRepository = Depends(get_repository)
+    record: LogCreateSchema,
+    repo: AbstractLogRepository = Depends(get_repository),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     Use this endpoint to create a new log.
     """
-    log = await create_log(record.model_dump(), repo)
+    with admission.admit("sync"):
+        log = await create_log(record.model_dump(), repo)
 
     # return create_log_response(LogRetrieveSchema(**log.model_dump()))
     return LogCreateResponse(data=LogRetrieveSchema(**log.model_dump()))
 
 
+@logging_router.post(
+    "/batch/",
+    response_model=LogBatchCreateResponse[list[LogBatchItemStatusSchema]],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_207_MULTI_STATUS: {
+            "description": "Some of the logs could not be stored; check the status of each item.",
+        },
+        status.HTTP_413_CONTENT_TOO_LARGE: {
+            "description": "The batch exceeds the maximum allowed size.",
+            "content": {
+                "application/json": {"example": PayloadTooLargeError().example}
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response,
+    },
+)
+async def post_logs_batch(
+    records: list[LogCreateSchema],
+    response: Response,
+    repo: AbstractLogRepository = Depends(get_repository),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """
+    Use this endpoint to create many logs at once; they are stored with a single bulk write.
+    The status of each log is reported in the same order as the request; if some of them fail, a 207 status code is returned.
+    """
+    with admission.admit("batch", len(records)):
+        logs, failed = await create_logs(
+            [record.model_dump() for record in records], repo
+        )
+
+    data = [
+        LogBatchItemStatusSchema(index=i, status="failed", detail=failed[i])
+        if i in failed
+        else LogBatchItemStatusSchema(index=i, uid=log.uid, status="created")
+        for i, log in enumerate(logs)
+    ]
+    if failed:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+
+    return LogBatchCreateResponse(
+        data=data, accepted=len(logs) - len(failed), rejected=len(failed)
+    )
+
+
+@logging_router.post(
+    "/ndjson/",
+    response_model=LogStreamCreateResponse[list[int]],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_207_MULTI_STATUS: {
+            "description": "Some of the lines were rejected; their numbers are returned as data.",
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response,
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def post_logs_ndjson(
+    request: Request,
+    response: Response,
+    repo: AbstractLogRepository = Depends(get_repository),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """
+    Use this endpoint to stream newline-delimited JSON logs (one log per line); the body is consumed incrementally
+    and the logs are stored in rolling batches. The numbers of the rejected lines (1-based) are returned as data.
+    """
+    with admission.admit("ndjson"):
+        accepted, rejected = await create_logs_stream(request.stream(), repo)
+
+    if rejected:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+
+    return LogStreamCreateResponse(
+        data=rejected, accepted=accepted, rejected=len(rejected)
+    )
+
+
+@logging_router.get(
+    "/search/",
+    response_model=LogReadListResponse[list[LogRetrieveSchema]],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_304_NOT_MODIFIED: not_modified_response,
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time range is empty, or the cursor is invalid.",
+            "content": {"application/json": {"example": BadRequestError().example}},
+        },
+    },
+)
+async def search_logs(
+    repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
+    tenant: str | None = None,
+    level: Annotated[list[Level], Query()] = [],
+    tag: str | None = None,
+    group: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    q: str | None = None,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
+):
+    """
+    Use this endpoint to retrieve the logs matching all the given criteria at once: `tenant`, `level` (repeat it to match
+    any of several levels), `tag`, `group` (a group path of the form "root-node1", matching the group and all the groups under it)
+    and a time range of `since` (inclusive) and `until` (exclusive).
+    Pass `q` to search the payloads and the metadata of the logs for all the given words; the results are then ranked by relevance
+    (unless paged by cursor, which always goes from the newest to the oldest).
+    """
+    search = LogSearchSchema(
+        tenant=tenant,
+        level=level,
+        tag=tag,
+        group=group,
+        since=since,
+        until=until,
+        q=q,
+    )
+    projection = parse_fields(fields)
+    await conditional.logs(repo, search_filter(search), count)
+    logs, total = await read_logs_search(
+        search, repo, offset, limit, cursor, count, projection
+    )
+
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
+    )
+
+
+@logging_router.get(
+    "/export/",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The matching logs, one per line.",
+            "content": {
+                "application/x-ndjson": {},
+                "text/csv": {},
+                "application/gzip": {},
+            },
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time range is empty.",
+            "content": {"application/json": {"example": BadRequestError().example}},
+        },
+    },
+)
+async def export_logs_file(
+    repo: AbstractLogRepository = Depends(get_repository),
+    tenant: str | None = None,
+    level: Annotated[list[Level], Query()] = [],
+    tag: str | None = None,
+    group: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    q: str | None = None,
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+):
+    """
+    Use this endpoint to download all the logs matching the criteria of the search endpoint, from the newest to the oldest,
+    as NDJSON (a JSON object per line) or as CSV (with the payload, the metadata and the execution path JSON-encoded);
+    pass `gzip=true` to receive them gzip-compressed.
+    The logs are streamed as they are read from the database, therefore exports of any size take the same memory.
+    """
+    search = LogSearchSchema(
+        tenant=tenant,
+        level=level,
+        tag=tag,
+        group=group,
+        since=since,
+        until=until,
+        q=q,
+    )
+    chunks = export_logs(search, repo, format, gzip)
+    filename = f"logs.{format.value}" + (".gz" if gzip else "")
+
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@logging_router.get(
+    "/tail/",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "The logs, as they are stored.",
+            "content": {"text/event-stream": {}},
+        },
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "Too many live tails are open.",
+            "content": {
+                "application/json": {"example": ServiceUnavailableError().example}
+            },
+        },
+    },
+)
+async def tail_logs_events(
+    bus: LogEventBus = Depends(get_event_bus),
+    tenant: str | None = None,
+    level: Annotated[list[Level], Query()] = [],
+    tag: str | None = None,
+    group: str | None = None,
+):
+    """
+    Use this endpoint to watch the logs as they are stored, as Server-Sent Events (a `log` event per log), optionally filtered by
+    `tenant`, `level` (repeat it to match any of several levels), `tag` and `group` (matching the group and all the groups under it).
+    A client that does not keep up with the stored logs receives a `dropped` event and is disconnected.
+    """
+    search = LogSearchSchema(tenant=tenant, level=level, tag=tag, group=group)
+    events = tail_logs(search, bus)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@logging_router.get(
+    "/stats/",
+    response_model=LogStatsResponse[list[LogStatsBucketSchema]],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {
+            "description": "The time range is empty or spans too many buckets.",
+            "content": {"application/json": {"example": BadRequestError().example}},
+        }
+    },
+)
+async def get_stats(
+    repo: AbstractLogRepository = Depends(get_repository),
+    granularity: RollupGranularity = RollupGranularity.MINUTE,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    tenant: str | None = None,
+    level: Annotated[list[Level], Query()] = [],
+    tag: str | None = None,
+    group: str | None = None,
+    by: StatsDimension | None = None,
+):
+    """
+    Use this endpoint to retrieve the number of logs per minute or per hour (`granularity`) between `since` (inclusive)
+    and `until` (exclusive; now by default), optionally broken down `by` tenant, level, tag or group root and filtered by
+    `tenant`, `level` (repeat it to match any of several levels), `tag` and `group` (the root of the group paths).
+    Statistics are read from counters maintained as logs are stored, therefore they cost the same regardless of the number of logs;
+    the buckets without logs are omitted.
+    """
+    stats = await read_stats(
+        repo, granularity, since, until, tenant, level, tag, group, by
+    )
+
+    return LogStatsResponse(data=[LogStatsBucketSchema(**item) for item in stats])
+
+
 @logging_router.get(
     "/{uid}",
     response_model=LogReadResponse[LogRetrieveSchema],
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_304_NOT_MODIFIED: not_modified_response,
         status.HTTP_404_NOT_FOUND: {
             "description": "Log not found",
             "content": {"application/json": {"example": NotFoundError().example}},
-        }
+        },
     },
 )
 async def get_log_by_id(
     uid: str,
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
+    fields: str | None = None,
 ):
     """
     Use this endpoint to retrieve a log by its uid.
+    Logs are never updated, therefore the ETag of a log never changes: send it back in the If-None-Match header
+    to get a 304 Not Modified instead of the log.
     """
-    log = await read_log(uid, repo)
+    projection = parse_fields(fields)
+    conditional.log(uid, projection)
+    log = await read_log(uid, repo, projection)
 
-    # return read_log_response(LogRetrieveSchema(**log.model_dump()))
-    return LogReadResponse(data=LogRetrieveSchema(**log.model_dump()))
+    return NegotiatedJSONResponse(
+        LogReadResponse.content(log, projection), headers=conditional.headers
+    )
 
 
 @logging_router.get(
     "/",
     response_model=LogReadListResponse[list[LogRetrieveSchema]],
     status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: not_modified_response},
 )
 async def get_logs_list(
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
 ):
     """
     Use this endpoint to retrieve all logs within the database.
+    Pages are selected either by offset and limit or, for deep pages, by cursor: pass an empty cursor for the first page (newest logs first)
+    and then the `next_cursor` of each response. On large collections, pass `count=estimated` for a cheaper, estimated total
+    (flagged by `total_exact`) or `count=none` to skip it; the same holds for all the list endpoints.
+    Every page carries an ETag that changes as matching logs are stored: send it back in the If-None-Match header to get
+    a 304 Not Modified while the page is unchanged; the same holds for all the list endpoints too.
+    Pass `fields` (e.g. "uid,level,tag,created_at") to read and return only these fields of the logs; the same holds
+    for all the read endpoints.
     """
-    logs, total = await read_logs_list(repo, offset, limit)
+    projection = parse_fields(fields)
+    await conditional.logs(repo, LogFilter(), count)
+    logs, total = await read_logs_list(
+        repo, offset, limit, cursor, count, projection
+    )
 
-    # return read_logs_response([LogRetrieveSchema(**log.model_dump()) for log in logs])
-    return LogReadListResponse(
-        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=total
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
     )
 
 
@@ -108,21 +510,32 @@ async def get_logs_list(
     "/tag/{tag}",
     response_model=LogReadListResponse[list[LogRetrieveSchema]],
     status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: not_modified_response},
 )
 async def get_logs_by_tag(
     tag: str,
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
 ):
     """
     Given a tag, retrieve all logs with that tag using this endpoint.
     """
-    logs, total = await read_logs_by_tag(tag, repo, offset, limit)
+    projection = parse_fields(fields)
+    await conditional.logs(repo, LogFilter(tag=tag), count)
+    logs, total = await read_logs_by_tag(
+        tag, repo, offset, limit, cursor, count, projection
+    )
 
-    # return read_logs_response([LogRetrieveSchema(**log.model_dump()) for log in logs])
-    return LogReadListResponse(
-        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=total
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
     )
 
 
@@ -130,21 +543,32 @@ async def get_logs_by_tag(
     "/level/{level}",
     response_model=LogReadListResponse[list[LogRetrieveSchema]],
     status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: not_modified_response},
 )
 async def get_logs_by_level(
     level: Level,
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
 ):
     """
     Use this endpoint to retrieve all logs with a specific level.
     """
-    logs, total = await read_logs_by_level(level, repo, offset, limit)
+    projection = parse_fields(fields)
+    await conditional.logs(repo, LogFilter(levels=[level]), count)
+    logs, total = await read_logs_by_level(
+        level, repo, offset, limit, cursor, count, projection
+    )
 
-    # return read_logs_response([LogRetrieveSchema(**log.model_dump()) for log in logs])
-    return LogReadListResponse(
-        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=total
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
     )
 
 
@@ -152,22 +576,34 @@ async def get_logs_by_level(
     "/group/{group_path}/",
     response_model=LogReadListResponse[list[LogRetrieveSchema]],
     status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: not_modified_response},
 )
 async def get_logs_by_group_path(
     group_path: str,
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
 ):
     """
     Use this endpoint to retrieve all logs with a specific group path.
     The group path is a string of the form "root-node1-node2" and this endpoint will retrieve all logs with this exact group path.
     """
-    logs, total = await read_logs_by_group_path(group_path, repo, offset, limit)
+    # the subtree of the group, i.e. the logs of the group and more
+    projection = parse_fields(fields)
+    await conditional.logs(repo, LogFilter(group_path=group_path.split("-")), count)
+    logs, total = await read_logs_by_group_path(
+        group_path, repo, offset, limit, cursor, count, projection
+    )
 
-    # return read_logs_response([LogRetrieveSchema(**log.model_dump()) for log in logs])
-    return LogReadListResponse(
-        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=total
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
     )
 
 
@@ -175,25 +611,34 @@ async def get_logs_by_group_path(
     "/group/{group_path}/children/",
     response_model=LogReadListResponse[list[LogRetrieveSchema]],
     status_code=status.HTTP_200_OK,
+    responses={status.HTTP_304_NOT_MODIFIED: not_modified_response},
 )
 async def get_logs_by_group_path_children(
     group_path: str,
     repo: AbstractLogRepository = Depends(get_repository),
+    conditional: ConditionalGet = Depends(),
     offset: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode(settings.COUNT_MODE),
+    fields: str | None = None,
 ):
     """
     Use this endpoint to retrieve all logs that are defined under a specific group path.
     Unlike the /logs/group/{group_path} endpoint that returns only the logs with the specific group path,
     this endpoint will retrieve all logs that are defined under the group path.
     """
+    projection = parse_fields(fields)
+    await conditional.logs(repo, LogFilter(group_path=group_path.split("-")), count)
     logs, total = await read_logs_by_group_path_children(
-        group_path, repo, offset, limit
+        group_path, repo, offset, limit, cursor, count, projection
     )
 
-    # return read_logs_response([LogRetrieveSchema(**log.model_dump()) for log in logs])
-    return LogReadListResponse(
-        data=[LogRetrieveSchema(**log.model_dump()) for log in logs], total=total
+    return NegotiatedJSONResponse(
+        LogReadListResponse.content(
+            logs, total, next_cursor(logs, limit, cursor), projection
+        ),
+        headers=conditional.headers,
     )
 
 
@@ -207,11 +652,14 @@ async def get_logs_by_group_path_children(
             "content": {
                 "application/json": {"example": ServiceUnavailableError().example}
             },
-        }
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response,
     },
 )
 async def post_log_non_blocking(
-    record: LogCreateSchema, celery_app: Celery = Depends(get_celery_app)
+    record: LogCreateSchema,
+    celery_app: Celery = Depends(get_celery_app),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     For the cases of high-throughput log creation and to avoid blocking the main thread,
@@ -219,29 +667,108 @@ async def post_log_non_blocking(
     the message queue and celery worker must be active.
     """
 
-    log = await create_log_non_blocking(record.model_dump(), celery_app)
+    with admission.admit("non_blocking"):
+        log = await create_log_non_blocking(record.model_dump(), celery_app)
 
     # return non_blocking_create_log_response(log)
     return NonBlockingLogCreateResponse(data=log)
 
 
+@logging_router.post(
+    "/non-blocking/batch/",
+    response_model=NonBlockingLogCreateResponse[list[dict]],
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "This endpoint requires an active message queue; such service not found.",
+            "content": {
+                "application/json": {"example": ServiceUnavailableError().example}
+            },
+        },
+        status.HTTP_413_CONTENT_TOO_LARGE: {
+            "description": "The batch exceeds the maximum allowed size.",
+            "content": {
+                "application/json": {"example": PayloadTooLargeError().example}
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response,
+    },
+)
+async def post_logs_batch_non_blocking(
+    records: list[LogCreateSchema],
+    celery_app: Celery = Depends(get_celery_app),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """
+    Use this endpoint to queue many logs at once; they are sent to the celery worker in chunks of `CELERY_BATCH_SIZE` logs,
+    each of which is written to the database with a single bulk write. Similar to the non-blocking endpoint,
+    the message queue and celery worker must be active.
+    """
+
+    with admission.admit("non_blocking", len(records)):
+        logs = await create_logs_non_blocking(
+            [record.model_dump() for record in records], celery_app
+        )
+
+    return NonBlockingLogCreateResponse(
+        data=logs, message="Logs creation queued successfully"
+    )
+
+
 @logging_router.post(
     "/non-blocking/builtin/",
     response_model=NonBlockingLogCreateResponse[dict],
     status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        status.HTTP_503_SERVICE_UNAVAILABLE: {
+            "description": "The in-process log buffer is full.",
+            "content": {
+                "application/json": {
+                    "example": ServiceUnavailableError("Log buffer is full.").example
+                }
+            },
+        },
+        status.HTTP_429_TOO_MANY_REQUESTS: too_many_requests_response,
+    },
 )
 async def post_log_non_blocking_builtin(
     record: LogCreateSchema,
-    background_tasks: BackgroundTasks,
-    repo: AbstractLogRepository = Depends(get_repository),
+    log_buffer: LogWriteBuffer = Depends(get_log_buffer),
+    admission: AdmissionController = Depends(get_admission_controller),
 ):
     """
     For the cases of high-throughput log creation and to avoid blocking the main thread,
-    use this endpoint to create a new log without blocking the main thread. This endpoint uses Background tasks
-    from FastAPI, therefore this requires no external services (e.g. celery worker and message queue), unlike the non-blocking endpoint.
+    use this endpoint to create a new log without blocking the main thread. This endpoint uses an in-process buffer
+    whose logs are written to the database in bulk, therefore this requires no external services (e.g. celery worker and message queue), unlike the non-blocking endpoint.
     """
 
-    background_tasks.add_task(_save_log, record.model_dump())
+    admission.admit_buffered(log_buffer.pending)
+    log = await create_log_buffered(record.model_dump(), log_buffer)
+
+    return NonBlockingLogCreateResponse(data=log.model_dump())
 
-    # return non_blocking_create_log_response(record.model_dump())
-    return NonBlockingLogCreateResponse(data=record.model_dump())
+
+@logging_router.get(
+    "/metrics/",
+    response_model=MetricsResponse[dict],
+    status_code=status.HTTP_200_OK,
+)
+async def get_metrics(
+    log_buffer: LogWriteBuffer = Depends(get_log_buffer),
+    celery_app: Celery = Depends(get_celery_app),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """
+    Use this endpoint to retrieve the internal counters of the service (e.g. the state of the in-process log buffer).
+    """
+    spool = get_spool()
+    return MetricsResponse(
+        data={
+            "buffer": log_buffer.stats(),
+            "broker": get_broker_monitor(celery_app).stats(),
+            "spool": spool.stats() if spool is not None else None,
+            "admission": admission.stats(),
+            "log_cache": get_log_cache().stats(),
+            "result_cache": get_result_cache().stats(),
+        }
+    )
@@ -1,5 +1,8 @@
 from datetime import datetime
-from logs.models import BaseLog
+from typing import Literal, Optional
+from pydantic import BaseModel
+from base_error import BadRequestError
+from logs.models import BaseLog, Level
 
 
 class LogCreateSchema(BaseLog):
@@ -10,3 +13,40 @@ class LogRetrieveSchema(BaseLog):
     uid: str
     created_at: datetime
     group_path: list[str] | None = None
+
+
+def parse_fields(fields: Optional[str]) -> Optional[list[str]]:
+    """
+    Parses a comma-separated list of fields of the LogRetrieveSchema; None stands for all the fields.
+    """
+    if fields is None:
+        return None
+    parsed = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in parsed if field not in LogRetrieveSchema.model_fields]
+    if unknown or not parsed:
+        allowed = ", ".join(LogRetrieveSchema.model_fields)
+        raise BadRequestError(f"`fields` must be a comma-separated list of {allowed}.").error
+    return parsed
+
+
+class LogBatchItemStatusSchema(BaseModel):
+    index: int
+    uid: str | None = None
+    status: Literal["created", "failed"]
+    detail: str | None = None
+
+
+class LogSearchSchema(BaseModel):
+    tenant: str | None = None
+    level: list[Level] = []
+    tag: str | None = None
+    group: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+    q: str | None = None
+
+
+class LogStatsBucketSchema(BaseModel):
+    bucket: datetime
+    key: str | None = None
+    count: int
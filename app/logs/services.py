@@ -1,11 +1,30 @@
 from interfaces.log_repository import AbstractLogRepository
 from logs.models import Log
+from logs.filters import LogFilter
+from logs.stats import RollupGranularity, StatsDimension
+from logs.models import Level
+from logs.pagination import CountMode, LogCursor
+from logs.export import ExportFormat, render_export
+from logs.events import LogEventBus
+from logs.buffer import LogWriteBuffer
 from celery import Celery
 from fastapi.encoders import jsonable_encoder
-from tasks import create_log_task
+from tasks import create_log_task, create_logs_batch_task
 from kombu.exceptions import OperationalError
-from base_error import NotFoundError
-from logs.errors import ServiceUnavailableError
+from aio_pika.exceptions import AMQPError
+from queues.registry import get_log_queue
+from queues.health import BrokerHealthMonitor, get_broker_monitor
+from queues.spool import get_spool
+import asyncio
+import hashlib
+from functools import partial
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable
+from pydantic import ValidationError
+from logs.schemas import LogCreateSchema, LogRetrieveSchema, LogSearchSchema
+from base_error import BadRequestError, NotFoundError, NotModifiedError
+from logs.errors import ServiceUnavailableError, PayloadTooLargeError
+from settings import settings
 
 
 async def create_log(record: dict, repo: AbstractLogRepository) -> Log:
@@ -16,8 +35,101 @@ async def create_log(record: dict, repo: AbstractLogRepository) -> Log:
     return log
 
 
-async def read_log(uid: str, repo: AbstractLogRepository) -> Log:
-    log = await repo.get(uid)
+async def create_logs(
+    records: list[dict], repo: AbstractLogRepository
+) -> tuple[list[Log], dict[int, str]]:
+    if len(records) > settings.BATCH_MAX_SIZE:
+        raise PayloadTooLargeError(
+            f"A batch may contain at most {settings.BATCH_MAX_SIZE} logs."
+        ).error
+
+    logs = [Log(**record) for record in records]
+
+    failed = await repo.insert_many(logs)
+
+    return logs, failed
+
+
+async def create_logs_stream(
+    chunks: AsyncIterator[bytes],
+    repo: AbstractLogRepository,
+    batch_size: int = settings.NDJSON_BATCH_SIZE,
+    max_line_size: int = settings.NDJSON_MAX_LINE_SIZE,
+) -> tuple[int, list[int]]:
+    """
+    Consumes a stream of newline-delimited JSON logs, writing them to the repository in batches of `batch_size`,
+    so that the body is never held in memory as a whole. Returns the number of stored logs and the (1-based)
+    numbers of the lines that were rejected, either because they are not valid logs or because they could not be stored.
+    """
+    accepted, rejected = 0, []
+    batch: list[Log] = []
+    batch_lines: list[int] = []
+
+    async def write_batch():
+        nonlocal accepted, batch, batch_lines
+        failed = await repo.insert_many(batch)
+        accepted += len(batch) - len(failed)
+        rejected.extend(batch_lines[index] for index in failed)
+        batch, batch_lines = [], []
+
+    def parse_line(line: bytes, line_number: int):
+        if not line.strip():
+            return
+        if len(line) > max_line_size:
+            rejected.append(line_number)
+            return
+        try:
+            batch.append(Log(**LogCreateSchema.model_validate_json(line).model_dump()))
+            batch_lines.append(line_number)
+        except ValidationError:
+            rejected.append(line_number)
+
+    pending, line_number, oversized = b"", 0, False
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            line_number += 1
+            if oversized:
+                rejected.append(line_number)
+                oversized = False
+            else:
+                parse_line(line, line_number)
+            if len(batch) >= batch_size:
+                await write_batch()
+        if len(pending) > max_line_size:
+            # drop the rest of a line that is too long, instead of buffering it
+            pending, oversized = b"", True
+
+    if pending or oversized:
+        line_number += 1
+        if oversized:
+            rejected.append(line_number)
+        else:
+            parse_line(pending, line_number)
+    if batch:
+        await write_batch()
+
+    return accepted, sorted(rejected)
+
+
+async def _spool(records: list[dict]) -> bool:
+    spool = get_spool()
+    return spool is not None and await asyncio.to_thread(spool.append, records)
+
+
+async def create_log_buffered(record: dict, log_buffer: LogWriteBuffer) -> Log:
+    log = Log(**record)
+
+    if not log_buffer.add(log) and not await _spool([log.model_dump()]):
+        raise ServiceUnavailableError("Log buffer is full.").error
+
+    return log
+
+
+async def read_log(
+    uid: str, repo: AbstractLogRepository, fields: list[str] | None = None
+) -> Log:
+    log = await repo.get(uid, fields)
 
     if not log:
         raise NotFoundError().error
@@ -25,47 +137,303 @@ async def read_log(uid: str, repo: AbstractLogRepository) -> Log:
     return log
 
 
+def _cursor(cursor: str | None) -> LogCursor | None:
+    return LogCursor.decode(cursor) if cursor is not None else None
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison, as If-None-Match calls for
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def check_not_modified(etag: str, if_none_match: str | None) -> None:
+    """
+    Raises a 304 Not Modified if the client's copy (as given by its If-None-Match header) is current.
+    """
+    if _etag_matches(etag, if_none_match):
+        raise NotModifiedError(etag).error
+
+
+def read_log_etag(uid: str, media_type: str, fields: list[str] | None = None) -> str:
+    """
+    Logs are never updated, therefore the ETag of a log is strong and permanent: its uid, along with its media type
+    and its fields, if not all of them.
+    """
+    subtype = media_type.rsplit("/", 1)[-1]
+    variant = [uid] if subtype == "json" else [uid, subtype]
+    if fields is not None:
+        variant.append(",".join(sorted(fields)))
+    return f'"{"-".join(variant)}"'
+
+
+async def read_logs_etag(
+    repo: AbstractLogRepository,
+    filters: LogFilter,
+    page: str,
+    media_type: str,
+    count: CountMode = CountMode.EXACT,
+) -> str:
+    """
+    The ETag of a page of logs changes with the version of the logs matching its filters (see `version`), which is
+    mostly answered from the cache rather than the query; `page` identifies the endpoint and its parameters.
+    """
+    version = await repo.version(filters, count)
+    digest = hashlib.sha256(repr((version, page, media_type)).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
 async def read_logs_list(
-    repo: AbstractLogRepository, offset: int = 0, limit: int = 10
-) -> list[Log]:
-    return await repo.all(offset, limit)
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
+    return await repo.all(offset, limit, _cursor(cursor), count, fields)
 
 
 async def read_logs_by_tag(
-    tag: str, repo: AbstractLogRepository, offset: int = 0, limit: int = 10
-) -> list[Log]:
-    return await repo.find_by_tag(tag, offset, limit)
+    tag: str,
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
+    return await repo.find_by_tag(tag, offset, limit, _cursor(cursor), count, fields)
 
 
 async def read_logs_by_level(
-    level: str, repo: AbstractLogRepository, offset: int = 0, limit: int = 10
-) -> list[Log]:
-    return await repo.find_by_level(level, offset, limit)
+    level: str,
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
+    return await repo.find_by_level(
+        level, offset, limit, _cursor(cursor), count, fields
+    )
 
 
 async def read_logs_by_group_path(
-    group_path: str, repo: AbstractLogRepository, offset: int = 0, limit: int = 10
-) -> list[Log]:
+    group_path: str,
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
     group_path_list = group_path.split("-")
-    return await repo.find_by_group_path(group_path_list, offset, limit)
+    return await repo.find_by_group_path(
+        group_path_list, offset, limit, _cursor(cursor), count, fields
+    )
 
 
 async def read_logs_by_group_path_children(
-    group_path: str, repo: AbstractLogRepository, offset: int = 0, limit: int = 10
-) -> list[Log]:
+    group_path: str,
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
     group_path_list = group_path.split("-")
-    return await repo.find_children_by_group_path(group_path_list, offset, limit)
+    return await repo.find_children_by_group_path(
+        group_path_list, offset, limit, _cursor(cursor), count, fields
+    )
 
 
-async def create_log_non_blocking(record: dict, celery_app: Celery):
-    import logging
+def search_filter(search: LogSearchSchema) -> LogFilter:
+    if (
+        search.since is not None
+        and search.until is not None
+        and search.since >= search.until
+    ):
+        raise BadRequestError("`since` must be earlier than `until`.").error
+
+    return LogFilter(
+        tenant=search.tenant,
+        levels=search.level,
+        tag=search.tag,
+        group_path=search.group.split("-") if search.group is not None else None,
+        created_from=search.since,
+        created_to=search.until,
+        text=search.q,
+    )
+
 
+async def read_logs_search(
+    search: LogSearchSchema,
+    repo: AbstractLogRepository,
+    offset: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.EXACT,
+    fields: list[str] | None = None,
+) -> tuple[list[Log], int | None]:
+    filters = search_filter(search)
+    return await repo.search(filters, offset, limit, _cursor(cursor), count, fields)
+
+
+def export_logs(
+    search: LogSearchSchema,
+    repo: AbstractLogRepository,
+    export_format: ExportFormat = ExportFormat.NDJSON,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Validates the filters right away, so that an invalid export fails before the response has started;
+    the logs are only read as the returned chunks are consumed.
+    """
+    filters = search_filter(search)
+    return render_export(repo.export(filters), export_format, compress)
+
+
+async def _tail_events(
+    bus: LogEventBus, filters: LogFilter, heartbeat: float
+) -> AsyncIterator[str]:
+    # subscribes once the response starts, so that an abandoned response leaves no subscription behind
+    subscription = bus.subscribe(filters)
+    if subscription is None:
+        # the bus filled up since the request was accepted
+        yield "event: dropped\ndata: {}\n\n"
+        return
     try:
-        logging.warning("starting")
-        with celery_app.connection_or_acquire() as conn:
-            conn.ensure_connection(max_retries=1, timeout=2)
-        create_log_task.delay(jsonable_encoder(record))
-        return record
+        while True:
+            try:
+                log = await subscription.get(timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # keeps the connection (and the proxies in between) from timing out
+                yield ": keep-alive\n\n"
+                continue
+            if log is None:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            data = LogRetrieveSchema(**log.model_dump()).model_dump_json()
+            yield f"id: {log.uid}\nevent: log\ndata: {data}\n\n"
+    finally:
+        bus.unsubscribe(subscription)
+
+
+def tail_logs(
+    search: LogSearchSchema,
+    bus: LogEventBus,
+    heartbeat: float = settings.TAIL_HEARTBEAT_INTERVAL,
+) -> AsyncIterator[str]:
+    """
+    Returns the logs stored once the response has started, as Server-Sent Events;
+    fails right away, before the response has started, if there are too many subscriptions already.
+    """
+    if bus.is_full:
+        raise ServiceUnavailableError("Too many live tails; retry later.").error
+    return _tail_events(
+        bus,
+        LogFilter(
+            tenant=search.tenant,
+            levels=search.level,
+            tag=search.tag,
+            group_path=search.group.split("-") if search.group is not None else None,
+        ),
+        heartbeat,
+    )
 
-    except OperationalError:
+
+async def read_stats(
+    repo: AbstractLogRepository,
+    granularity: RollupGranularity = RollupGranularity.MINUTE,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    tenant: str | None = None,
+    levels: list[Level] | None = None,
+    tag: str | None = None,
+    group_root: str | None = None,
+    by: StatsDimension | None = None,
+) -> list[dict]:
+    until = until or datetime.now()
+    since = since or until - granularity.delta * settings.STATS_DEFAULT_BUCKETS
+    if since >= until:
+        raise BadRequestError("`since` must be earlier than `until`.").error
+    if (until - since) / granularity.delta > settings.STATS_MAX_BUCKETS:
+        raise BadRequestError(
+            f"At most {settings.STATS_MAX_BUCKETS} buckets may be requested; "
+            "use a coarser granularity."
+        ).error
+
+    return await repo.stats(
+        granularity, since, until, tenant, levels, tag, group_root, by
+    )
+
+
+async def _publish(
+    monitor: BrokerHealthMonitor,
+    publish: Callable[[], Awaitable],
+    records: list[dict],
+):
+    """
+    Publishes the records unless the broker is down; in that case they are spooled to the disk, if spooling is enabled.
+    The logs are spooled with their uid and creation time, so that replaying a segment again (after a failure halfway)
+    does not store them twice.
+    """
+    if await monitor.is_available():
+        try:
+            await publish()
+            monitor.breaker.record_success()
+            return
+        except (OperationalError, AMQPError, OSError):
+            monitor.breaker.record_failure()
+
+    if not await _spool([Log(**record).model_dump() for record in records]):
         raise ServiceUnavailableError().error
+
+
+async def create_log_non_blocking(record: dict, celery_app: Celery):
+    monitor = get_broker_monitor(celery_app)
+
+    if settings.MQ_CONSUMER == "native":
+        await _publish(
+            monitor, partial(get_log_queue().enqueue_many, [record]), [record]
+        )
+    else:
+        # the celery producer is synchronous, therefore it publishes from a worker thread
+        await _publish(
+            monitor,
+            partial(asyncio.to_thread, create_log_task.delay, jsonable_encoder(record)),
+            [record],
+        )
+    return record
+
+
+async def create_logs_non_blocking(records: list[dict], celery_app: Celery):
+    if len(records) > settings.BATCH_MAX_SIZE:
+        raise PayloadTooLargeError(
+            f"A batch may contain at most {settings.BATCH_MAX_SIZE} logs."
+        ).error
+
+    monitor = get_broker_monitor(celery_app)
+    records = jsonable_encoder(records)
+
+    if settings.MQ_CONSUMER == "native":
+        await _publish(monitor, partial(get_log_queue().enqueue_many, records), records)
+    else:
+        for i in range(0, len(records), settings.CELERY_BATCH_SIZE):
+            chunk = records[i : i + settings.CELERY_BATCH_SIZE]
+            await _publish(
+                monitor,
+                partial(asyncio.to_thread, create_logs_batch_task.delay, chunk),
+                chunk,
+            )
+    return records
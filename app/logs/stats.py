@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import Literal
+
+# the dimensions the statistics can be broken down by
+StatsDimension = Literal["tenant", "level", "tag", "group_root"]
+
+
+class RollupGranularity(StrEnum):
+    MINUTE = "minute"
+    HOUR = "hour"
+
+    @property
+    def delta(self) -> timedelta:
+        if self == RollupGranularity.MINUTE:
+            return timedelta(minutes=1)
+        return timedelta(hours=1)
+
+    def truncate(self, moment: datetime) -> datetime:
+        """
+        Start of the bucket of the given moment.
+        """
+        moment = moment.replace(second=0, microsecond=0)
+        if self == RollupGranularity.HOUR:
+            moment = moment.replace(minute=0)
+        return moment
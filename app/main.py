@@ -3,7 +3,15 @@ from fastapi import Depends, FastAPI
 from settings import settings
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from database import init_db
+from logs.buffer import get_log_buffer
+from queues.registry import close_log_queue
+from queues.health import get_broker_monitor
+from queues.celery_worker import celery_app
+from queues.spool import SpoolReplayer, get_spool
+from repositories.mongo_repository import MongoLogRepository, get_log_document
+from logs.events import ChangeStreamPublisher, get_event_bus
 from logs.routes import logging_router
 from security.api_key_verifier import verify_api_key
 import logging
@@ -14,11 +22,36 @@ async def lifespan(app: FastAPI):
     # Optional: log startup event
     logging.info("🔌 Initializing DB connection...")
     await init_db(settings.DB_ADDRESS, settings.DB_NAME)
+    log_buffer = get_log_buffer()
+    log_buffer.start()
+    broker_monitor = get_broker_monitor(celery_app)
+    if settings.NON_BLOCKING_AVAILABLE:
+        broker_monitor.start()
+    spool = get_spool()
+    spool_replayer = SpoolReplayer(spool, MongoLogRepository()) if spool else None
+    if spool_replayer is not None:
+        spool_replayer.start()
+    change_stream = (
+        ChangeStreamPublisher(get_event_bus(), get_log_document())
+        if settings.TAIL_SOURCE == "change_stream"
+        else None
+    )
+    if change_stream is not None:
+        change_stream.start()
 
     yield  # app is running...
 
     # Optional: log shutdown event
     logging.info("🛑 Cleaning up on shutdown...")
+    await broker_monitor.stop()
+    if change_stream is not None:
+        await change_stream.stop()
+    if spool_replayer is not None:
+        await spool_replayer.stop()
+    await log_buffer.stop()
+    if spool is not None:
+        spool.seal()
+    await close_log_queue()
     if hasattr(app.state, "listener"):
         app.state.listener.cancel()
 
@@ -30,6 +63,7 @@ app = FastAPI(
     redoc_url=settings.redoc_url if settings.debug else None,
     lifespan=lifespan,
 )
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(logging_router, prefix="/logs", tags=["logs"], dependencies=[Depends(verify_api_key)])
 
@@ -0,0 +1,192 @@
+import zlib
+from contextvars import ContextVar
+from typing import Callable
+import msgpack
+import orjson
+import zstandard
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from base_error import BadRequestError, UnsupportedMediaTypeError
+from logs.errors import PayloadTooLargeError
+from settings import settings
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_response_media_type: ContextVar[str] = ContextVar(
+    "response_media_type", default=JSON_MEDIA_TYPE
+)
+
+_ZLIB_DECOMPRESS = type(zlib.decompressobj())
+_ZSTD_INPUT_SLICE = 256
+_DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
+
+def _decompressor(encoding: str):
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise UnsupportedMediaTypeError(f"Unsupported content encoding: {encoding}").error
+
+
+def _decompress(decompressor, data: bytes, max_length: int):
+    """
+    Yields the decompressed data in pieces of about `max_length` bytes at most, so that a small body that expands
+    hugely (a decompression bomb) is never inflated at once.
+    """
+    if not isinstance(decompressor, _ZLIB_DECOMPRESS):
+        # zstd has no output limit, but 4 bytes (the smallest block) expand to a 128 KiB block at most
+        for start in range(0, len(data), _ZSTD_INPUT_SLICE):
+            yield decompressor.decompress(data[start : start + _ZSTD_INPUT_SLICE])
+        return
+    while data:
+        yield decompressor.decompress(data, max_length)
+        data = decompressor.unconsumed_tail
+
+
+def _media_types(header: str) -> list[str]:
+    """
+    Parses an Accept header into its media types, most preferred first.
+    """
+    weighted = []
+    for position, item in enumerate(header.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    pass
+        if media_type and quality > 0:
+            weighted.append((-quality, position, media_type.lower()))
+    return [media_type for *_, media_type in sorted(weighted)]
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    for media_type in _media_types(accept or ""):
+        if media_type in MSGPACK_MEDIA_TYPES:
+            return MSGPACK_MEDIA_TYPES[0]
+        if media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+class DecodedRequest(Request):
+    """
+    Request whose body is transparently decompressed according to its Content-Encoding (gzip, deflate or zstd);
+    corrupt bodies are rejected with 400, and bodies decompressing to more than `DECOMPRESSED_MAX_SIZE` bytes with 413.
+    """
+
+    async def stream(self):
+        encoding = self.headers.get("content-encoding", "identity").lower()
+        if hasattr(self, "_body") or encoding == "identity":
+            async for chunk in super().stream():
+                yield chunk
+            return
+
+        decompressor = _decompressor(encoding)
+        decoded = 0
+        try:
+            async for chunk in super().stream():
+                for data in _decompress(decompressor, chunk, _DECOMPRESS_CHUNK_SIZE):
+                    decoded += len(data)
+                    if decoded > settings.DECOMPRESSED_MAX_SIZE:
+                        raise PayloadTooLargeError(
+                            f"The decompressed body exceeds {settings.DECOMPRESSED_MAX_SIZE} bytes."
+                        ).error
+                    yield data
+            yield decompressor.flush()
+        except (zlib.error, zstandard.ZstdError):
+            raise BadRequestError(f"Malformed {encoding} body.").error
+
+
+class NegotiatedJSONResponse(JSONResponse):
+    """
+    JSON response that is rendered as MessagePack instead, when the client asked for it through the Accept header.
+    The content may hold datetimes and enums (e.g. the envelopes built by `LogReadListResponse.content`), besides JSON types.
+    """
+
+    def render(self, content) -> bytes:
+        if _response_media_type.get() in MSGPACK_MEDIA_TYPES:
+            self.media_type = MSGPACK_MEDIA_TYPES[0]
+            return msgpack.packb(content, default=jsonable_encoder)
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return super().render(jsonable_encoder(content))
+
+
+def _compress_response(request: Request, response: Response) -> Response:
+    """
+    Compresses buffered responses with zstd, if the client accepts it; gzip is left to the GZipMiddleware,
+    which also covers streaming responses.
+    """
+    body = getattr(response, "body", None)
+    if (
+        body is None
+        or "content-encoding" in response.headers
+        or len(body) < settings.COMPRESSION_MIN_SIZE
+        or "zstd" not in request.headers.get("accept-encoding", "")
+    ):
+        return response
+
+    response.body = zstandard.ZstdCompressor().compress(body)
+    response.headers["content-encoding"] = "zstd"
+    response.headers["content-length"] = str(len(response.body))
+    response.headers.append("vary", "Accept-Encoding")
+    return response
+
+
+class NegotiatedRoute(APIRoute):
+    """
+    Route that accepts compressed (gzip, deflate, zstd) and MessagePack request bodies and negotiates
+    the response encoding (JSON or MessagePack, optionally zstd-compressed) from the Accept and Accept-Encoding headers.
+    """
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def negotiated_route_handler(request: Request) -> Response:
+            scope = request.scope
+            content_type = request.headers.get("content-type", "").split(";")[0].strip()
+            encoding = request.headers.get("content-encoding", "identity").lower()
+            if encoding != "identity":
+                _decompressor(encoding)  # reject unsupported encodings early
+
+            msgpack_body = content_type in MSGPACK_MEDIA_TYPES
+            if msgpack_body:
+                # let FastAPI validate the decoded body as if it were JSON
+                scope = dict(scope)
+                scope["headers"] = [
+                    (key, value)
+                    for key, value in scope["headers"]
+                    if key != b"content-type"
+                ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+
+            request = DecodedRequest(scope, request.receive)
+            if msgpack_body:
+                try:
+                    request._json = msgpack.unpackb(await request.body())
+                except ValueError:
+                    raise BadRequestError("Malformed MessagePack body.").error
+
+            token = _response_media_type.set(
+                negotiate_media_type(request.headers.get("accept"))
+            )
+            try:
+                response = await original_route_handler(request)
+            finally:
+                _response_media_type.reset(token)
+
+            if isinstance(response, NegotiatedJSONResponse):
+                response.headers.append("vary", "Accept")
+            return _compress_response(request, response)
+
+        return negotiated_route_handler
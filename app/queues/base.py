@@ -5,3 +5,10 @@ class AbstractLogQueue(ABC):
     @abstractmethod
     async def enqueue(self, log_data: dict):
         pass
+
+    async def enqueue_many(self, log_data_list: list[dict]):
+        for log_data in log_data_list:
+            await self.enqueue(log_data)
+
+    async def close(self):
+        pass
@@ -0,0 +1,106 @@
+"""
+Native asyncio consumer of the log queue; an alternative to the celery worker.
+
+Deliveries are accumulated into batches (up to `CONSUMER_BATCH_SIZE` logs, or whatever arrived within
+`CONSUMER_BATCH_TIMEOUT` seconds), written to the repository with a single bulk insert and acknowledged
+together, only after the write has succeeded. Run it from the app directory with:
+
+    python -m queues.consumer
+"""
+
+import asyncio
+import json
+import logging
+from aio_pika import connect_robust
+from aio_pika.abc import AbstractIncomingMessage
+from pydantic import ValidationError
+from database import init_db
+from interfaces.log_repository import AbstractLogRepository
+from logs.models import Log
+from settings import settings
+
+
+class LogConsumer:
+    def __init__(
+        self,
+        repo: AbstractLogRepository,
+        url: str = settings.MQ_URL,
+        queue_name: str = settings.QUEUE_NAME,
+        prefetch_count: int = settings.MQ_PREFETCH_COUNT,
+        batch_size: int = settings.CONSUMER_BATCH_SIZE,
+        batch_timeout: float = settings.CONSUMER_BATCH_TIMEOUT,
+    ):
+        self.repo = repo
+        self.url = url
+        self.queue_name = queue_name
+        self.prefetch_count = prefetch_count
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+
+        self._deliveries: asyncio.Queue[AbstractIncomingMessage] = asyncio.Queue()
+
+    async def _on_message(self, message: AbstractIncomingMessage) -> None:
+        await self._deliveries.put(message)
+
+    async def _next_batch(self) -> list[AbstractIncomingMessage]:
+        batch = [await self._deliveries.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_timeout
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._deliveries.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def process_batch(self, messages: list[AbstractIncomingMessage]) -> None:
+        logs, delivered = [], []
+        for message in messages:
+            try:
+                logs.append(Log(**json.loads(message.body)))
+                delivered.append(message)
+            except (ValueError, ValidationError):
+                logging.error(f"Rejecting malformed log message: {message.body[:200]!r}")
+                await message.reject(requeue=False)
+
+        if not logs:
+            return
+
+        try:
+            failed = await self.repo.insert_many(logs)
+        except Exception:
+            logging.exception(f"❌ Failed to store {len(logs)} logs; requeueing them.")
+            await delivered[-1].nack(multiple=True, requeue=True)
+            return
+
+        for index, reason in failed.items():
+            logging.error(f"Failed to add log {logs[index].uid}: {reason}")
+        await delivered[-1].ack(multiple=True)
+
+    async def run(self) -> None:
+        connection = await connect_robust(self.url)
+
+        async with connection:
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=self.prefetch_count)
+            queue = await channel.declare_queue(self.queue_name, durable=True)
+            await queue.consume(self._on_message)
+            logging.info(f"🐇 Consuming logs from '{self.queue_name}'...")
+
+            while True:
+                await self.process_batch(await self._next_batch())
+
+
+async def main():
+    from repositories.mongo_repository import MongoLogRepository
+
+    await init_db(settings.DB_ADDRESS, settings.DB_NAME, index_build="skip")
+    await LogConsumer(MongoLogRepository()).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
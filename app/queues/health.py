@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from enum import StrEnum
+from celery import Celery
+from settings import settings
+
+
+class CircuitState(StrEnum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Once `failure_threshold` consecutive failures are recorded (or the broker is reported down), the circuit opens
+    and requests fail fast; after `reset_timeout` seconds it becomes half-open and lets requests through again,
+    until the next success closes it or the next failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.BROKER_FAILURE_THRESHOLD,
+        reset_timeout: float = settings.BROKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        return self.state != CircuitState.OPEN
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if (
+            self.failures >= self.failure_threshold
+            or self.state == CircuitState.HALF_OPEN
+        ):
+            self.trip()
+
+    def trip(self) -> None:
+        self._opened_at = time.monotonic()
+
+
+class BrokerHealthMonitor:
+    """
+    Tracks the reachability of the message broker, by probing it in the background every `interval` seconds,
+    so that the request handlers never wait on a broker round trip to know whether it is available.
+    """
+
+    def __init__(
+        self,
+        celery_app: Celery,
+        breaker: CircuitBreaker | None = None,
+        interval: float = settings.BROKER_HEALTH_INTERVAL,
+        timeout: float = settings.BROKER_HEALTH_TIMEOUT,
+    ):
+        self.celery_app = celery_app
+        self.breaker = breaker or CircuitBreaker()
+        self.interval = interval
+        self.timeout = timeout
+        self.available: bool | None = None
+        self._task: asyncio.Task | None = None
+
+    def _probe(self) -> bool:
+        try:
+            with self.celery_app.connection_or_acquire() as conn:
+                conn.ensure_connection(max_retries=1, timeout=self.timeout)
+            return True
+        except Exception as e:
+            logging.warning(f"Message broker is not reachable: {e}")
+            return False
+
+    async def check(self) -> bool:
+        self.available = await asyncio.to_thread(self._probe)
+        if self.available:
+            self.breaker.record_success()
+        else:
+            self.breaker.trip()
+        return self.available
+
+    async def is_available(self) -> bool:
+        if self.available is None:
+            # not probed yet (e.g. the monitor is not started); probe once, in a worker thread
+            await self.check()
+        return self.breaker.allow_request()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "circuit": self.breaker.state,
+            "failures": self.breaker.failures,
+        }
+
+
+_broker_monitor: BrokerHealthMonitor | None = None
+
+
+def get_broker_monitor(celery_app: Celery) -> BrokerHealthMonitor:
+    global _broker_monitor
+    if _broker_monitor is None or _broker_monitor.celery_app is not celery_app:
+        _broker_monitor = BrokerHealthMonitor(celery_app)
+    return _broker_monitor
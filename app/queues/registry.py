@@ -14,3 +14,10 @@ def get_log_queue() -> AbstractLogQueue:
         # Default to RabbitMQ
         register_log_queue(RabbitMQLogQueue())
     return _log_queue_backend
+
+
+async def close_log_queue():
+    global _log_queue_backend
+    if _log_queue_backend is not None:
+        await _log_queue_backend.close()
+    _log_queue_backend = None
@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Literal
+from fastapi.encoders import jsonable_encoder
+from interfaces.log_repository import AbstractLogRepository
+from logs.models import Log
+from settings import settings
+
+
+class DiskSpool:
+    """
+    Durable, append-only spool of logs on the local disk, used by the non-blocking endpoints when the message broker
+    or the database is not available.
+
+    Logs are appended as NDJSON lines to segment files of at most `segment_size` bytes; once a segment is full it is
+    sealed and a new one is started. The spool as a whole never grows beyond `quota` bytes. Depending on `fsync`,
+    the segment is flushed to the disk after every append ("always"), at most every `fsync_interval` seconds ("interval")
+    or whenever the OS decides ("never").
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.SPOOL_DIR,
+        segment_size: int = settings.SPOOL_SEGMENT_SIZE,
+        quota: int = settings.SPOOL_QUOTA,
+        fsync: Literal["always", "interval", "never"] = settings.SPOOL_FSYNC,
+        fsync_interval: float = settings.SPOOL_FSYNC_INTERVAL,
+    ):
+        self.directory = Path(directory)
+        self.segment_size = segment_size
+        self.quota = quota
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._segments: dict[Path, int] = {}  # segment -> number of records
+        self._size = 0
+        self._active = None
+        self._active_path: Path | None = None
+        self._last_fsync = 0.0
+        self.rejected = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.directory.glob("*.ndjson")):
+            self._segments[path] = sum(1 for _ in self._iter_lines(path))
+            self._size += path.stat().st_size
+
+    def _segment_path(self) -> Path:
+        sequence = int(max(self._segments).stem) + 1 if self._segments else 0
+        return self.directory / f"{sequence:012d}.ndjson"
+
+    def _open_segment(self) -> None:
+        self._active_path = self._segment_path()
+        self._active = open(self._active_path, "ab")
+        self._segments[self._active_path] = 0
+
+    def _close_segment(self) -> None:
+        if self._active is not None:
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            self._active.close()
+        self._active = None
+        self._active_path = None
+
+    def append(self, records: list[dict]) -> bool:
+        """
+        Append the records to the spool; returns False (and stores nothing) if that would exceed the quota.
+        """
+        data = b"".join(
+            json.dumps(jsonable_encoder(record)).encode() + b"\n" for record in records
+        )
+        with self._lock:
+            if self._size + len(data) > self.quota:
+                self.rejected += len(records)
+                return False
+
+            if self._active is None:
+                self._open_segment()
+            self._active.write(data)
+            self._segments[self._active_path] += len(records)
+            self._size += len(data)
+
+            if self.fsync == "always" or (
+                self.fsync == "interval"
+                and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._active.flush()
+                os.fsync(self._active.fileno())
+                self._last_fsync = time.monotonic()
+
+            if self._active.tell() >= self.segment_size:
+                self._close_segment()
+        return True
+
+    def seal(self) -> None:
+        """
+        Seal the active segment, so that it can be replayed.
+        """
+        with self._lock:
+            self._close_segment()
+
+    def sealed_segments(self) -> list[Path]:
+        with self._lock:
+            return sorted(path for path in self._segments if path != self._active_path)
+
+    @staticmethod
+    def _iter_lines(path: Path) -> Iterator[bytes]:
+        if path.stat().st_size == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while (end := mm.find(b"\n", start)) != -1:
+                yield mm[start:end]
+                start = end + 1
+
+    def read_segment(self, path: Path) -> Iterator[dict]:
+        for line in self._iter_lines(path):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logging.error(f"Skipping corrupted line in spool segment {path.name}.")
+
+    def remove_segment(self, path: Path) -> None:
+        with self._lock:
+            if path == self._active_path:
+                return
+            self._size -= path.stat().st_size
+            self._segments.pop(path, None)
+            path.unlink()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "records": sum(self._segments.values()),
+                "bytes": self._size,
+                "segments": len(self._segments),
+                "quota": self.quota,
+                "rejected": self.rejected,
+            }
+
+
+class SpoolReplayer:
+    """
+    Drains the spool into the repository in bulk; segments are removed only once all their logs are written,
+    therefore as long as the backend is down they are kept and retried every `interval` seconds.
+    """
+
+    def __init__(
+        self,
+        spool: DiskSpool,
+        repo: AbstractLogRepository,
+        interval: float = settings.SPOOL_REPLAY_INTERVAL,
+        batch_size: int = settings.SPOOL_REPLAY_BATCH_SIZE,
+    ):
+        self.spool = spool
+        self.repo = repo
+        self.interval = interval
+        self.batch_size = batch_size
+        self.replayed = 0
+        self._task: asyncio.Task | None = None
+
+    async def _replay_segment(self, path: Path) -> None:
+        records = self.spool.read_segment(path)
+
+        def next_batch() -> list[Log]:
+            return [Log(**record) for record in itertools.islice(records, self.batch_size)]
+
+        try:
+            # the segment is read and parsed off the event loop, a batch at a time
+            while batch := await asyncio.to_thread(next_batch):
+                await self._write(batch)
+        finally:
+            records.close()
+
+    async def _write(self, logs: list[Log]) -> None:
+        failed = await self.repo.insert_many(logs)
+        for index, reason in failed.items():
+            logging.error(f"Failed to replay log {logs[index].uid}: {reason}")
+        self.replayed += len(logs) - len(failed)
+
+    async def replay(self) -> None:
+        await asyncio.to_thread(self.spool.seal)
+        for path in await asyncio.to_thread(self.spool.sealed_segments):
+            try:
+                await self._replay_segment(path)
+            except Exception as e:
+                logging.warning(f"Spool replay postponed, the backend is not available: {e}")
+                return
+            await asyncio.to_thread(self.spool.remove_segment, path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.spool.stats()["records"]:
+                await self.replay()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_spool: DiskSpool | None = None
+
+
+def get_spool() -> DiskSpool | None:
+    """
+    Returns the spool of the process, or None if spooling is disabled.
+    """
+    global _spool
+    if settings.SPOOL_ENABLED and _spool is None:
+        _spool = DiskSpool()
+    return _spool if settings.SPOOL_ENABLED else None
@@ -0,0 +1,63 @@
+"""
+Migration that backfills the `group_ancestors` of the logs stored before it was introduced; until it has run,
+such logs are not found by the group children queries.
+
+Documents are walked in `_id` order and updated in batches of `--batch-size`, with one update per distinct
+group path of the batch, so that it can run against a live collection (and be resumed, if interrupted). Run it from the app directory with:
+
+    python -m repositories.backfill_group_ancestors [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import logging
+from repositories.mongo_repository import get_log_document, group_ancestors
+
+
+async def backfill_group_ancestors(batch_size: int = 1000) -> int:
+    """
+    Returns the number of updated logs.
+    """
+    collection = get_log_document().get_motor_collection()
+    query = {"group_path": {"$ne": None}, "group_ancestors": {"$exists": False}}
+    updated, last_id = 0, None
+
+    while True:
+        batch_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        docs = (
+            await collection.find(batch_query, {"group_path": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .to_list(batch_size)
+        )
+        if not docs:
+            return updated
+
+        ids_by_path: dict[tuple, list] = {}
+        for doc in docs:
+            ids_by_path.setdefault(tuple(doc["group_path"]), []).append(doc["_id"])
+        for group_path, ids in ids_by_path.items():
+            result = await collection.update_many(
+                {"_id": {"$in": ids}},
+                {"$set": {"group_ancestors": group_ancestors(list(group_path))}},
+            )
+            updated += result.modified_count
+        last_id = docs[-1]["_id"]
+        logging.info(f"Backfilled the group ancestors of {updated} logs...")
+
+
+async def main(batch_size: int):
+    from database import init_db
+
+    await init_db(index_build="skip")
+    updated = await backfill_group_ancestors(batch_size)
+    logging.info(f"✅ Backfilled the group ancestors of {updated} logs.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill the group ancestors of the stored logs."
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
@@ -0,0 +1,64 @@
+"""
+Batch job that builds the rollups of the logs stored before the rollups were enabled (or while they were disabled).
+
+The logs created in [--since, --until) are walked in `_id` order, in batches of `--batch-size`, and added to the counters
+of their buckets. The rollups are incremented, not overwritten, therefore `--until` must be the moment the rollups were
+enabled (the logs stored since then are counted already) and the job must not be run twice over the same range.
+Run it from the app directory with:
+
+    python -m repositories.backfill_rollups --until 2024-01-01T00:00:00 [--since ...] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from repositories.mongo_repository import get_log_document
+from repositories.rollups import record_rollups
+
+
+async def backfill_rollups(
+    until: datetime, since: Optional[datetime] = None, batch_size: int = 1000
+) -> int:
+    """
+    Returns the number of counted logs.
+    """
+    document = get_log_document()
+    created_at = {"$lt": until}
+    if since is not None:
+        created_at["$gte"] = since
+    counted, last_id = 0, None
+
+    while True:
+        query = {"created_at": created_at}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = await document.find(query).sort("+_id").limit(batch_size).to_list()
+        if not docs:
+            return counted
+
+        await record_rollups([doc.to_log() for doc in docs])
+        counted += len(docs)
+        last_id = docs[-1].id
+        logging.info(f"Counted {counted} logs into the rollups...")
+
+
+async def main(until: datetime, since: Optional[datetime], batch_size: int):
+    from database import init_db
+
+    await init_db(index_build="skip")
+    counted = await backfill_rollups(until, since, batch_size)
+    logging.info(f"✅ Counted {counted} logs into the rollups.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the rollups of the logs stored before they were enabled."
+    )
+    parser.add_argument("--until", type=datetime.fromisoformat, required=True)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    logging.basicConfig(level=logging.INFO)
+    args = parser.parse_args()
+    asyncio.run(main(args.until, args.since, args.batch_size))
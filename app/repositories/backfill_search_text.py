@@ -0,0 +1,67 @@
+"""
+Migration that backfills the `search_text` of the logs stored before the full-text search was introduced;
+until it has run, such logs are not found by the `q` of the search endpoint.
+
+Documents are walked in `_id` order and updated in batches of `--batch-size` (whose updates are sent concurrently),
+so that it can run against a live collection (and be resumed, if interrupted). Run it from the app directory with:
+
+    python -m repositories.backfill_search_text [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import logging
+from logs.models import Log
+from repositories.mongo_repository import get_log_document, search_text
+
+
+async def backfill_search_text(batch_size: int = 1000) -> int:
+    """
+    Returns the number of updated logs.
+    """
+    collection = get_log_document().get_motor_collection()
+    query = {"search_text": {"$exists": False}}
+    updated, last_id = 0, None
+
+    while True:
+        batch_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        docs = (
+            await collection.find(batch_query, {"log": 1, "metadata": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .to_list(batch_size)
+        )
+        if not docs:
+            return updated
+
+        logs = [
+            Log(log=doc.get("log", {}), metadata=doc.get("metadata", {})) for doc in docs
+        ]
+        results = await asyncio.gather(
+            *(
+                collection.update_one(
+                    {"_id": doc["_id"]}, {"$set": {"search_text": search_text(log)}}
+                )
+                for doc, log in zip(docs, logs)
+            )
+        )
+        updated += sum(result.modified_count for result in results)
+        last_id = docs[-1]["_id"]
+        logging.info(f"Backfilled the search text of {updated} logs...")
+
+
+async def main(batch_size: int):
+    from database import init_db
+
+    await init_db(index_build="skip")
+    updated = await backfill_search_text(batch_size)
+    logging.info(f"✅ Backfilled the search text of {updated} logs.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill the search text of the stored logs."
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+from settings import settings
+
+
+class CountCache:
+    """
+    Cache of the exact number of logs matching each filter, so that paging through a filter does not count
+    the whole matching set on every page.
+
+    Entries expire after `ttl` seconds, which bounds the staleness caused by writers of other processes (e.g. the celery worker);
+    the writes of this process invalidate the entries of the filters they affect right away. At most `max_entries`
+    filters are kept, the least recently used ones are evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.COUNT_CACHE_TTL,
+        max_entries: int = settings.COUNT_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_count_cache: CountCache | None = None
+
+
+def get_count_cache() -> CountCache:
+    global _count_cache
+    if _count_cache is None:
+        _count_cache = CountCache()
+    return _count_cache
@@ -0,0 +1,125 @@
+"""
+Management of the indexes declared on the document models of the logs (see `get_log_document`) and of their rollups.
+
+Reports the declared indexes that are missing from the database (or whose keys have changed), the indexes of
+the database that are not declared, and the indexes that were not used since the server started (according to
+`$indexStats`), per collection. Run it from the app directory with:
+
+    python -m repositories.indexes [--create]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Optional
+from pymongo.errors import OperationFailure
+from repositories.mongo_repository import get_log_document, refresh_available_indexes
+from repositories.rollups import MongoRollupDocument
+
+_index_build_task: asyncio.Task | None = None
+
+
+def _documents() -> list:
+    return [get_log_document(), MongoRollupDocument]
+
+
+def _declared(document) -> dict[str, list]:
+    return {
+        index.document["name"]: list(index.document["key"].items())
+        for index in document.Settings.indexes
+    }
+
+
+async def sync_indexes() -> list[str]:
+    """
+    Creates the declared indexes of all the collections that do not exist yet; existing ones are left untouched.
+    """
+    names = []
+    for document in _documents():
+        collection = document.get_motor_collection()
+        names += await collection.create_indexes(document.Settings.indexes)
+    await refresh_available_indexes()
+    return names
+
+
+async def _build_indexes() -> None:
+    try:
+        names = await sync_indexes()
+        logging.info(f"✅ Indexes are built: {', '.join(names)}")
+    except Exception:
+        logging.exception("❌ Failed to build the indexes.")
+
+
+def build_indexes_in_background() -> None:
+    """
+    Builds the declared indexes without delaying the startup; until they are ready, queries fall back to collection scans.
+    """
+    global _index_build_task
+    if _index_build_task is None or _index_build_task.done():
+        _index_build_task = asyncio.create_task(_build_indexes())
+
+
+async def _index_usage(collection) -> Optional[dict[str, int]]:
+    try:
+        return {
+            stat["name"]: stat["accesses"]["ops"]
+            async for stat in collection.aggregate([{"$indexStats": {}}])
+        }
+    except OperationFailure as e:
+        logging.warning(f"Index usage is not available: {e}")
+        return None
+
+
+async def index_report(document=None) -> dict:
+    """
+    Reports the indexes of the collection of the given document model, the logs by default.
+    """
+    document = document or get_log_document()
+    collection = document.get_motor_collection()
+    existing = {
+        name: list(info["key"])
+        for name, info in (await collection.index_information()).items()
+        if name != "_id_"
+    }
+    declared = _declared(document)
+    usage = await _index_usage(collection)
+
+    return {
+        "missing": sorted(name for name in declared if name not in existing),
+        "changed": sorted(
+            name
+            for name, key in declared.items()
+            if name in existing and existing[name] != key
+        ),
+        "undeclared": sorted(name for name in existing if name not in declared),
+        "unused": (
+            sorted(name for name in existing if usage.get(name, 0) == 0)
+            if usage is not None
+            else None
+        ),
+    }
+
+
+async def main(create: bool = False):
+    from database import init_db
+
+    await init_db(index_build="skip")
+    if create:
+        await sync_indexes()
+    report = {
+        document.Settings.name: await index_report(document)
+        for document in _documents()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report missing, changed, undeclared and unused indexes of the logs and rollups collections."
+    )
+    parser.add_argument(
+        "--create", action="store_true", help="create the missing indexes first"
+    )
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().create))
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+from interfaces.log_cache import AbstractLogCache
+from logs.models import Log
+from settings import settings
+
+
+class MemoryLogCache(AbstractLogCache):
+    """
+    In-process LRU cache of the logs by uid, filled as logs are read and stored.
+
+    Logs expire after `ttl` seconds, and unknown uids after `missing_ttl` seconds, which bounds how long a log stored
+    by another process (e.g. the celery worker) may be reported as missing. At most `max_entries` uids are kept,
+    the least recently used ones are evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.LOG_CACHE_TTL,
+        missing_ttl: float = settings.LOG_CACHE_MISSING_TTL,
+        max_entries: int = settings.LOG_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Optional[Log]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _set(self, uid: str, log: Optional[Log], ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[uid] = (time.monotonic() + ttl, log)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, uid: str) -> Tuple[bool, Optional[Log]]:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is not None and time.monotonic() >= entry[0]:
+                del self._entries[uid]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(uid)
+            self.hits += 1
+            return True, entry[1]
+
+    async def set_many(self, logs: Iterable[Log]) -> None:
+        for log in logs:
+            self._set(log.uid, log, self.ttl)
+
+    async def set_missing(self, uid: str) -> None:
+        self._set(uid, None, self.missing_ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_log_cache: MemoryLogCache | None = None
+
+
+def get_log_cache() -> MemoryLogCache:
+    global _log_cache
+    if _log_cache is None:
+        _log_cache = MemoryLogCache()
+    return _log_cache
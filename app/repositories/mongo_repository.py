@@ -1,7 +1,112 @@
 from interfaces.log_repository import AbstractLogRepository
 from logs.models import Log, Level
-from typing import List, Optional
-from beanie import Document
+from datetime import datetime, timezone
+from typing import (
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+from logs.events import get_event_bus
+from logs.filters import LogFilter
+from logs.pagination import CountMode, EstimatedCount, LogCursor
+from repositories.count_cache import get_count_cache
+from repositories.log_cache import get_log_cache
+from repositories.result_cache import get_result_cache
+from interfaces.log_cache import AbstractLogCache
+from repositories.rollups import query_rollups, record_rollups_safely
+from logs.stats import RollupGranularity, StatsDimension
+from beanie import Document, Granularity, TimeSeriesConfig
+from pydantic import BaseModel, Field
+import re
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import BulkWriteError
+from settings import settings
+
+GROUP_PATH_SEPARATOR = "\x1f"
+
+
+def group_ancestors(group_path: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Materialised path of a group: the keys of the group itself and of all its ancestors,
+    e.g. ["root", "root\x1fsection"] for ["root", "section"].
+    """
+    if group_path is None:
+        return None
+    return [
+        GROUP_PATH_SEPARATOR.join(group_path[:depth])
+        for depth in range(1, len(group_path) + 1)
+    ]
+
+
+def _log_indexes(
+    tenant: str = "tenant",
+    level: str = "level",
+    unique_uid: bool = True,
+    text: bool = True,
+) -> List[IndexModel]:
+    # The filtered lists are sorted newest first (`created_at`, then `uid` for keyset pagination),
+    # therefore the filters are indexed together with that order.
+    indexes = [
+        IndexModel([("uid", ASCENDING)], name="uid", unique=unique_uid),
+        IndexModel(
+            [("created_at", DESCENDING), ("uid", DESCENDING)], name="created_at_uid"
+        ),
+        IndexModel(
+            [(tenant, ASCENDING), ("created_at", DESCENDING), ("uid", DESCENDING)],
+            name="tenant_created_at",
+        ),
+        IndexModel(
+            [(level, ASCENDING), ("created_at", DESCENDING), ("uid", DESCENDING)],
+            name="level_created_at",
+        ),
+        IndexModel(
+            [("tag", ASCENDING), ("created_at", DESCENDING), ("uid", DESCENDING)],
+            name="tag_created_at",
+        ),
+        IndexModel([("group_path", ASCENDING)], name="group_path"),
+        IndexModel(
+            [
+                ("group_ancestors", ASCENDING),
+                ("created_at", DESCENDING),
+                ("uid", DESCENDING),
+            ],
+            name="group_ancestors_created_at",
+        ),
+    ]
+    if text:
+        # log payloads are not natural language; no stemming nor stop words
+        indexes.append(
+            IndexModel(
+                [("search_text", TEXT)], name="search_text", default_language="none"
+            )
+        )
+    return indexes
+
+
+def _strings(value) -> Iterator[str]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+    elif value is not None and not isinstance(value, bool):
+        yield str(value)
+
+
+def search_text(log: Log) -> str:
+    """
+    The values of the payload and of the metadata of a log, flattened into a single string for the full-text search;
+    it is computed once, when the log is stored, and truncated to `SEARCH_TEXT_MAX_SIZE` characters.
+    """
+    text = " ".join(_strings([log.log, log.metadata]))
+    return text[: settings.SEARCH_TEXT_MAX_SIZE]
 
 
 class MongoLogDocument(Document, Log):
@@ -11,17 +116,260 @@ class MongoLogDocument(Document, Log):
     This class inherits from the Log model from the app.logs.models module, but also adds Beanie-based document functionality.
     In case you need to add support for another database, you need to develop a counterpart of this class, using another ODM
     (e.g. PynamoDB for DynamoDB).
+
+    Besides the fields of the Log, documents store the `group_ancestors` of their group path,
+    so that the logs under a group are found with an equality match on an indexed array,
+    and the `search_text` of their payload and metadata, for the full-text search.
     """
 
+    group_ancestors: Optional[List[str]] = None
+    search_text: Optional[str] = None
+
+    # whether the collection has a text index; otherwise the full-text search falls back to regular expressions
+    text_index: ClassVar[bool] = True
+
     class Settings:
         name = "logs"
+        indexes = _log_indexes()
+
+    @classmethod
+    def field_path(cls, field: str) -> str:
+        """
+        Path of a field of the Log in the stored documents.
+        """
+        return field
 
     def to_log(self) -> Log:
-        return Log(**self.model_dump())
+        return Log(**self.model_dump(exclude={"group_ancestors", "search_text"}))
+
+    @classmethod
+    def to_record(cls, raw: dict) -> dict:
+        """
+        Fields of the Log, out of a raw document read without `_id`, `group_ancestors` and `search_text`.
+        """
+        return raw
 
     @classmethod
     def from_log(cls, log: Log):
-        return cls(**log.model_dump())
+        return cls(
+            **log.model_dump(),
+            group_ancestors=group_ancestors(log.group_path),
+            search_text=search_text(log),
+        )
+
+
+class LogMeta(BaseModel):
+    tenant: Optional[str] = None
+    level: Level = Level.NOTSET
+
+
+class MongoTimeSeriesLogDocument(Document):
+    """
+    Document model for a MongoDB time-series collection (`LOG_STORAGE=timeseries`), with `created_at` as the time field
+    and the `tenant` and the `level` of the logs as the meta field; logs with the same meta field are stored together,
+    in compressed buckets of consecutive times. Time-series collections do not support unique nor text indexes,
+    therefore the uniqueness of the uid is not enforced by the database in this mode and the full-text search
+    is done with regular expressions.
+    """
+
+    meta: LogMeta
+    log: dict | str = Field(default_factory=dict)
+    execution_path: dict | None = None
+    metadata: dict = Field(default_factory=dict)
+    tag: str | None = None
+    group_path: List[str] | None = None
+    group_ancestors: Optional[List[str]] = None
+    search_text: Optional[str] = None
+    uid: str
+    created_at: datetime
+
+    text_index: ClassVar[bool] = False
+
+    class Settings:
+        name = "logs_timeseries"
+        timeseries = TimeSeriesConfig(
+            time_field="created_at",
+            meta_field="meta",
+            granularity=Granularity(settings.TIMESERIES_GRANULARITY),
+            expire_after_seconds=settings.TIMESERIES_EXPIRE_AFTER,
+        )
+        indexes = _log_indexes(
+            "meta.tenant", "meta.level", unique_uid=False, text=False
+        )
+
+    @classmethod
+    def field_path(cls, field: str) -> str:
+        return f"meta.{field}" if field in LogMeta.model_fields else field
+
+    @classmethod
+    def to_record(cls, raw: dict) -> dict:
+        return {**raw, **raw.pop("meta", {})}
+
+    def to_log(self) -> Log:
+        return Log(
+            **self.model_dump(
+                exclude={"id", "revision_id", "meta", "group_ancestors", "search_text"}
+            ),
+            **self.meta.model_dump(),
+        )
+
+    @classmethod
+    def from_log(cls, log: Log):
+        return cls(
+            meta=LogMeta(tenant=log.tenant, level=log.level),
+            **log.model_dump(exclude={"tenant", "level"}),
+            group_ancestors=group_ancestors(log.group_path),
+            search_text=search_text(log),
+        )
+
+
+LogDocument = Type[MongoLogDocument] | Type[MongoTimeSeriesLogDocument]
+
+
+def get_log_document() -> LogDocument:
+    """
+    Returns the document model of the storage mode selected by `LOG_STORAGE`.
+    """
+    if settings.LOG_STORAGE == "timeseries":
+        return MongoTimeSeriesLogDocument
+    return MongoLogDocument
+
+
+# names of the indexes that exist, per collection; only these are hinted
+_available_indexes: dict[str, set[str]] = {}
+
+
+async def refresh_available_indexes(document: Optional[LogDocument] = None) -> None:
+    """
+    Records the indexes of the logs collection, so that searches only hint the indexes that exist: MongoDB rejects
+    the hint of an index that is missing (e.g. with `DB_INDEX_BUILD=skip`) or not built yet (`background`).
+    """
+    document = document or get_log_document()
+    collection = document.get_motor_collection()
+    _available_indexes[document.Settings.name] = set(await collection.index_information())
+
+
+def _filter_keys(log: Log) -> Iterator[Hashable]:
+    """
+    Yields the keys of the filters that a new log matches, i.e. of the cached counts and results it affects.
+    """
+    yield ("all",)
+    yield ("tenant", log.tenant)
+    yield ("tag", log.tag)
+    yield ("level", log.level)
+    if log.group_path is not None:
+        yield ("group_path", tuple(log.group_path))
+        for ancestor in group_ancestors(log.group_path):
+            yield ("children", ancestor)
+
+
+def _stored_form(log: Log) -> Log:
+    """
+    A copy of the log as it is read back from the database, which stores dates in UTC, to the millisecond;
+    the logs are cached in this form, so that reads do not depend on whether they hit the cache.
+    """
+    created_at = log.created_at
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    created_at = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+    return log.model_copy(update={"created_at": created_at}, deep=True)
+
+
+def _log_from_record(record: dict) -> Log:
+    """
+    Builds a log out of a stored record, without validating it again; only the fields of the record are set.
+    """
+    if "level" in record:
+        record["level"] = Level(record["level"])
+    return Log.model_construct(**record)
+
+
+def _uses_text_index(document: LogDocument) -> bool:
+    return document.text_index and settings.FULL_TEXT_SEARCH == "text"
+
+
+def _search_terms(text: Optional[str]) -> List[str]:
+    """
+    Quotes cannot be escaped within a phrase of a text search, therefore they separate the terms, in both modes.
+    """
+    return text.replace('"', " ").split() if text else []
+
+
+def _search_query(filters: LogFilter, document: LogDocument) -> dict:
+    query = {}
+    if filters.tenant is not None:
+        query[document.field_path("tenant")] = filters.tenant
+    if filters.levels:
+        query[document.field_path("level")] = {"$in": list(filters.levels)}
+    if filters.tag is not None:
+        query["tag"] = filters.tag
+    if filters.group_path is not None:
+        query["group_ancestors"] = GROUP_PATH_SEPARATOR.join(filters.group_path)
+    created_at = {}
+    if filters.created_from is not None:
+        created_at["$gte"] = filters.created_from
+    if filters.created_to is not None:
+        created_at["$lt"] = filters.created_to
+    if created_at:
+        query["created_at"] = created_at
+    terms = _search_terms(filters.text)
+    if terms:
+        if _uses_text_index(document):
+            # quoted, every term must appear (bare terms are ORed, and `-` negates them)
+            query["$text"] = {"$search": " ".join(f'"{term}"' for term in terms)}
+        else:
+            # every term must appear, regardless of the case
+            query["$and"] = [
+                {"search_text": {"$regex": re.escape(term), "$options": "i"}}
+                for term in terms
+            ]
+    return query
+
+
+def _search_hint(filters: LogFilter) -> str:
+    """
+    Picks the index of the most selective equality predicate of the search; all of them are followed by `created_at`
+    (and `uid`), therefore the time range and the order of the results are served by the same index.
+    """
+    if filters.tag is not None:
+        return "tag_created_at"
+    if filters.group_path is not None:
+        return "group_ancestors_created_at"
+    if filters.tenant is not None:
+        return "tenant_created_at"
+    if filters.levels:
+        return "level_created_at"
+    return "created_at_uid"
+
+
+def _search_key(filters: LogFilter) -> Hashable:
+    """
+    Key of the most selective filter among those of the search, i.e. the dimension its cached results depend on.
+    """
+    if filters.tag is not None:
+        return ("tag", filters.tag)
+    if filters.group_path is not None:
+        return ("children", GROUP_PATH_SEPARATOR.join(filters.group_path))
+    if filters.tenant is not None:
+        return ("tenant", filters.tenant)
+    if filters.levels and len(filters.levels) == 1:
+        return ("level", filters.levels[0])
+    return ("all",)
+
+
+def _count_key(filters: LogFilter) -> Optional[Hashable]:
+    """
+    Key of the count of the filters in the count cache, if they consist of a single dimension (as the list endpoints);
+    the counts of other combinations are not cached.
+    """
+    if filters.created_from or filters.created_to or filters.text:
+        return None
+    if filters.levels is not None and len(filters.levels) > 1:
+        return None
+    dimensions = (filters.tenant, filters.levels or None, filters.tag, filters.group_path)
+    if sum(dimension is not None for dimension in dimensions) > 1:
+        return None
+    return _search_key(filters)
 
 
 class MongoLogRepository(AbstractLogRepository):
@@ -30,88 +378,389 @@ class MongoLogRepository(AbstractLogRepository):
 
     This class provides methods for inserting, retrieving, and querying logs stored in MongoDB.
     Similar to the MongoLogDocument, if you need to add support for another database, you need to develop a counterpart of this class too.
+    Logs are stored through the document model of the selected storage mode (see `get_log_document`), unless another one is given.
+    Logs are read by uid through the given cache (the in-process one, by default), which is filled as logs are read and stored.
+    The pages of the list queries are cached too (see `ResultCache`), unless `cache_results` is False.
     """
 
+    def __init__(
+        self,
+        document: Optional[LogDocument] = None,
+        cache: Optional[AbstractLogCache] = None,
+        cache_results: bool = True,
+    ):
+        self.document = document or get_log_document()
+        self.cache = cache or get_log_cache()
+        self.cache_results = cache_results
+
     async def insert(self, log: Log):
-        return await MongoLogDocument.from_log(log).create()
+        doc = await self.document.from_log(log).create()
+        await self.cache.set_many([_stored_form(log)])
+        get_count_cache().invalidate(_filter_keys(log))
+        get_result_cache().bump(_filter_keys(log))
+        if settings.ROLLUPS_ENABLED:
+            await record_rollups_safely([log])
+        if settings.TAIL_SOURCE == "local":
+            get_event_bus().publish([log])
+        return doc
+
+    async def insert_many(self, logs: List[Log]) -> Dict[int, str]:
+        if not logs:
+            return {}
+        try:
+            await self.document.insert_many(
+                [self.document.from_log(log) for log in logs], ordered=False
+            )
+        except BulkWriteError as e:
+            failed = {
+                error["index"]: error.get("errmsg", "Write error")
+                for error in e.details.get("writeErrors", [])
+            }
+        else:
+            failed = {}
+        keys = {key for log in logs for key in _filter_keys(log)}
+        get_count_cache().invalidate(keys)
+        get_result_cache().bump(keys)
+        stored = [log for index, log in enumerate(logs) if index not in failed]
+        await self.cache.set_many([_stored_form(log) for log in stored])
+        if settings.ROLLUPS_ENABLED:
+            await record_rollups_safely(stored)
+        if settings.TAIL_SOURCE == "local":
+            get_event_bus().publish(stored)
+        return failed
+
+    async def get(self, uid: str, fields: Optional[List[str]] = None) -> Optional[Log]:
+        cached, log = await self.cache.get(uid)
+        if cached:
+            return log
+
+        raw = await self.document.get_motor_collection().find_one(
+            {"uid": uid}, self._projection(fields)
+        )
+        if raw is None:
+            await self.cache.set_missing(uid)
+            return None
+        log = _log_from_record(self.document.to_record(raw))
+        # partial logs are not cached
+        if fields is None:
+            await self.cache.set_many([log])
+        return log
+
+    def _projection(self, fields: Optional[List[str]] = None) -> dict:
+        if fields is None:
+            return {"_id": 0, "group_ancestors": 0, "search_text": 0}
+        projection = {"_id": 0}
+        for field in {*fields, "uid", "created_at"}:
+            projection[self.document.field_path(field)] = 1
+        return projection
 
-    async def get(self, uid: str) -> Optional[Log]:
-        doc = await MongoLogDocument.find_one({"uid": uid})
-        return doc.to_log() if doc else None
+    async def _count(
+        self, query: dict, key: Optional[Hashable], count: CountMode, **find_kwargs
+    ) -> Optional[int]:
+        if count == CountMode.NONE:
+            return None
 
-    async def all(self, offset: int = 0, limit: int = 10) -> List[Log]:
-        total = await MongoLogDocument.find_all().count()
-        docs = await MongoLogDocument.find_all().skip(offset).limit(limit).to_list()
-        return [doc.to_log() for doc in docs], total
+        cache = get_count_cache()
+        total = cache.get(key) if key is not None else None
+        if total is not None:
+            return total
+
+        if count == CountMode.ESTIMATED:
+            collection = self.document.get_motor_collection()
+            # the metadata of a time-series collection counts its buckets, rather than its logs
+            if not query and self.document is MongoLogDocument:
+                # taken from the collection metadata, without scanning anything
+                return EstimatedCount(await collection.estimated_document_count())
+            # stop counting at the limit; below it, the count is exact
+            total = await collection.count_documents(
+                query, limit=settings.COUNT_ESTIMATE_LIMIT, **find_kwargs
+            )
+            if total >= settings.COUNT_ESTIMATE_LIMIT:
+                return EstimatedCount(total)
+        else:
+            total = await self.document.find(query, **find_kwargs).count()
+
+        if key is not None:
+            cache.set(key, total)
+        return total
+
+    async def _find(
+        self,
+        query: dict,
+        key: Optional[Hashable],
+        offset: int,
+        limit: int,
+        cursor: Optional[LogCursor],
+        count: CountMode,
+        sort: Optional[list] = None,
+        dimension: Optional[Hashable] = None,
+        fields: Optional[List[str]] = None,
+        **find_kwargs,
+    ) -> Tuple[List[Log], Optional[int]]:
+        """
+        `key` identifies the filter in the count cache; the counts of the filters without a key are not cached.
+        `dimension` is the key of the filter whose new logs make the cached results stale (`key`, by default).
+        `sort` applies to the pages selected by offset; the pages selected by cursor are always in keyset order.
+        """
+        dimension = dimension or key
+        if not self.cache_results or dimension is None:
+            return await self._query(
+                query, key, offset, limit, cursor, count, sort, fields, **find_kwargs
+            )
+
+        result_cache = get_result_cache()
+        # the query identifies the filter; the hints and the storage mode do not change the results
+        result_key = (
+            self.document.Settings.name,
+            repr(query),
+            repr(sort),
+            offset,
+            limit,
+            cursor,
+            count,
+            tuple(sorted(fields)) if fields is not None else None,
+        )
+        cached = result_cache.get(dimension, result_key)
+        if cached is not None:
+            return cached
+        generation = result_cache.generation(dimension)
+        logs, total = await self._query(
+            query, key, offset, limit, cursor, count, sort, fields, **find_kwargs
+        )
+        result_cache.set(result_key, generation, (logs, total))
+        return logs, total
+
+    async def _query(
+        self,
+        query: dict,
+        key: Optional[Hashable],
+        offset: int,
+        limit: int,
+        cursor: Optional[LogCursor],
+        count: CountMode,
+        sort: Optional[list] = None,
+        fields: Optional[List[str]] = None,
+        **find_kwargs,
+    ) -> Tuple[List[Log], Optional[int]]:
+        total = await self._count(query, key, count, **find_kwargs)
+
+        if cursor is not None:
+            if not cursor.is_first_page:
+                query = {
+                    "$and": [
+                        query,
+                        {
+                            "$or": [
+                                {"created_at": {"$lt": cursor.created_at}},
+                                {
+                                    "created_at": cursor.created_at,
+                                    "uid": {"$lt": cursor.uid},
+                                },
+                            ]
+                        },
+                    ]
+                }
+            sort, offset = [("created_at", -1), ("uid", -1)], 0
+
+        # read straight from the driver, rather than through the document model: only the projected fields
+        # are transferred, and the logs (validated when they were stored) are not validated again
+        raws = self.document.get_motor_collection().find(
+            query, self._projection(fields), **find_kwargs
+        )
+        if sort:
+            raws = raws.sort(sort)
+        raws = await raws.skip(offset).limit(limit).to_list(limit)
+        return [_log_from_record(self.document.to_record(raw)) for raw in raws], total
+
+    async def all(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
+        return await self._find(
+            {}, ("all",), offset, limit, cursor, count, fields=fields
+        )
 
     async def find_by_tag(
-        self, tag: str, offset: int = 0, limit: int = 10
-    ) -> List[Log]:
-        total = await MongoLogDocument.find({"tag": tag}).count()
-        docs = (
-            await MongoLogDocument.find({"tag": tag})
-            .skip(offset)
-            .limit(limit)
-            .to_list()
+        self,
+        tag: str,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
+        return await self._find(
+            {"tag": tag}, ("tag", tag), offset, limit, cursor, count, fields=fields
         )
-        return [doc.to_log() for doc in docs], total
 
     async def find_by_level(
-        self, level: Level, offset: int = 0, limit: int = 10
-    ) -> List[Log]:
+        self,
+        level: Level,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
         if isinstance(level, str):
             level = Level(level)
         if not isinstance(level, Level):
             raise TypeError(f"'{level}' is not a valid Level")
-        total = await MongoLogDocument.find({"level": level}).count()
-        docs = (
-            await MongoLogDocument.find({"level": level})
-            .skip(offset)
-            .limit(limit)
-            .to_list()
+        return await self._find(
+            {self.document.field_path("level"): level},
+            ("level", level),
+            offset,
+            limit,
+            cursor,
+            count,
+            fields=fields,
         )
-        return [doc.to_log() for doc in docs], total
 
     async def find_by_group_path(
-        self, group_path: List[str], offset: int = 0, limit: int = 10
-    ) -> List[Log]:
-        total = await MongoLogDocument.find({"group_path": group_path}).count()
-        docs = (
-            await MongoLogDocument.find({"group_path": group_path})
-            .skip(offset)
-            .limit(limit)
-            .to_list()
+        self,
+        group_path: List[str],
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
+        return await self._find(
+            {"group_path": group_path},
+            ("group_path", tuple(group_path)),
+            offset,
+            limit,
+            cursor,
+            count,
+            fields=fields,
         )
-        return [doc.to_log() for doc in docs], total
 
     async def find_children_by_group_path(
-        self, group_path: List[str], offset: int = 0, limit: int = 10
-    ) -> List[Log]:
-        # Match all logs whose group_path starts with the given path
-        total = await MongoLogDocument.find(
-            {
-                "$expr": {
-                    "$eq": [
-                        {"$slice": ["$group_path", len(group_path)]},
-                        group_path,
-                    ]
-                }
-            }
-        ).count()
-
-        docs = (
-            await MongoLogDocument.find(
-                {
-                    "$expr": {
-                        "$eq": [
-                            {"$slice": ["$group_path", len(group_path)]},
-                            group_path,
-                        ]
-                    }
-                },
+        self,
+        group_path: List[str],
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
+        # Match all logs whose group_path starts with the given path, i.e. that have it among their ancestors
+        ancestor = GROUP_PATH_SEPARATOR.join(group_path)
+        return await self._find(
+            {"group_ancestors": ancestor},
+            ("children", ancestor),
+            offset,
+            limit,
+            cursor,
+            count,
+            fields=fields,
+        )
+
+    async def search(
+        self,
+        filters: LogFilter,
+        offset: int = 0,
+        limit: int = 10,
+        cursor: Optional[LogCursor] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Log], Optional[int]]:
+        ranked = bool(_search_terms(filters.text)) and _uses_text_index(self.document)
+        return await self._find(
+            _search_query(filters, self.document),
+            None,
+            offset,
+            limit,
+            cursor,
+            count,
+            sort=[("score", {"$meta": "textScore"})] if ranked else None,
+            dimension=_search_key(filters),
+            fields=fields,
+            **self._search_kwargs(filters),
+        )
+
+    def _search_kwargs(self, filters: LogFilter) -> dict:
+        ranked = bool(_search_terms(filters.text)) and _uses_text_index(self.document)
+        # a text search is always served by the text index
+        if settings.SEARCH_INDEX_HINT and not ranked:
+            hint = _search_hint(filters)
+            if hint in _available_indexes.get(self.document.Settings.name, ()):
+                return {"hint": hint}
+        return {}
+
+    async def _watermark(self, filters: LogFilter) -> Optional[Tuple[datetime, str]]:
+        newest = (
+            await self.document.get_motor_collection()
+            .find(
+                _search_query(filters, self.document),
+                {"_id": 0, "created_at": 1, "uid": 1},
+                **self._search_kwargs(filters),
             )
-            .skip(offset)
-            .limit(limit)
-            .to_list()
+            .sort([("created_at", -1), ("uid", -1)])
+            .limit(1)
+            .to_list(1)
+        )
+        return (newest[0]["created_at"], newest[0]["uid"]) if newest else None
+
+    async def version(
+        self, filters: LogFilter, count: CountMode = CountMode.EXACT
+    ) -> Hashable:
+        """
+        The newest log matching the filters along with their total (as counted with `count`), which changes even when
+        a log older than the newest one is stored (e.g. flushed by the buffer or replayed from the spool). Estimated
+        totals may stay the same, and no total is counted with `CountMode.NONE`: then the logs of the dimension
+        of the filters stored by this process (the generation of the dimension) are counted instead.
+        It is kept in the result cache until a log of the dimension of the filters is stored, therefore the database
+        is only queried when the cache holds no state (or is bypassed).
+        """
+        query = _search_query(filters, self.document)
+        dimension = _search_key(filters)
+        result_cache = get_result_cache()
+        key = ("version", self.document.Settings.name, repr(query), count)
+        if self.cache_results:
+            cached = result_cache.get(dimension, key)
+            if cached is not None:
+                return cached
+
+        generation = result_cache.generation(dimension)
+        total = await self._count(
+            query, _count_key(filters), count, **self._search_kwargs(filters)
+        )
+        version = (await self._watermark(filters), total)
+        if total is None or isinstance(total, EstimatedCount):
+            version += (result_cache.token, generation)
+        result_cache.set(key, generation, version)
+        return version
+
+    async def export(self, filters: LogFilter) -> AsyncIterator[dict]:
+        cursor = (
+            self.document.get_motor_collection()
+            .find(
+                _search_query(filters, self.document),
+                {"_id": 0, "group_ancestors": 0, "search_text": 0},
+                batch_size=settings.EXPORT_BATCH_SIZE,
+                **self._search_kwargs(filters),
+            )
+            .sort([("created_at", -1), ("uid", -1)])
+        )
+        async for raw in cursor:
+            yield self.document.to_record(raw)
+
+    async def stats(
+        self,
+        granularity: RollupGranularity,
+        since: datetime,
+        until: datetime,
+        tenant: Optional[str] = None,
+        levels: Optional[List[Level]] = None,
+        tag: Optional[str] = None,
+        group_root: Optional[str] = None,
+        by: Optional[StatsDimension] = None,
+    ) -> List[dict]:
+        return await query_rollups(
+            granularity, since, until, tenant, levels, tag, group_root, by
         )
-        return [doc.to_log() for doc in docs], total
@@ -0,0 +1,100 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+from settings import settings
+
+
+class ResultCache:
+    """
+    Cache of the pages of the list queries (the logs along with their total), so that the pages polled
+    over and over by dashboards are not queried again until a matching log is stored.
+
+    Each page depends on a single dimension (e.g. `("level", "ERROR")`, or `("all",)`) whose generation counter
+    is bumped whenever a log of that dimension is stored; a page cached at an older generation is stale, therefore
+    invalidating all the pages of a dimension costs a single increment. Entries also expire after `ttl` seconds,
+    which bounds the staleness caused by writers of other processes (e.g. the celery worker).
+    At most `max_entries` pages are kept, the least recently used ones are evicted first.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.RESULT_CACHE_TTL,
+        max_entries: int = settings.RESULT_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._generations: dict[Hashable, int] = {}
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # tells apart the generations of different processes (and of the same one, once cleared)
+        self.token = uuid.uuid4().hex
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def generation(self, dimension: Hashable) -> int:
+        """
+        Read the generation before running the query, so that a log stored meanwhile makes the result stale.
+        """
+        return self._generations.get(dimension, 0)
+
+    def bump(self, dimensions: Iterable[Hashable]) -> None:
+        with self._lock:
+            for dimension in dimensions:
+                self._generations[dimension] = self._generations.get(dimension, 0) + 1
+
+    def get(self, dimension: Hashable, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, generation, value = entry
+            if time.monotonic() >= expires_at or generation != self.generation(dimension):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, generation: int, value) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self.token = uuid.uuid4().hex
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+        }
+
+
+_result_cache: ResultCache | None = None
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
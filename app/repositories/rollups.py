@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+from logs.models import Level, Log
+from logs.stats import RollupGranularity, StatsDimension
+
+ROLLUP_KEY = ("granularity", "bucket", "tenant", "level", "tag", "group_root")
+
+
+class MongoRollupDocument(Document):
+    """
+    Number of logs per time bucket (a minute or an hour) and per combination of tenant, level, tag and group root,
+    incremented as logs are stored; statistics are answered from these counters instead of the logs themselves.
+    """
+
+    granularity: RollupGranularity
+    bucket: datetime
+    tenant: Optional[str] = None
+    level: Level = Level.NOTSET
+    tag: Optional[str] = None
+    group_root: Optional[str] = None
+    total: int = 0
+
+    class Settings:
+        name = "log_rollups"
+        indexes = [
+            IndexModel(
+                [(field, ASCENDING) for field in ROLLUP_KEY],
+                name="rollup_key",
+                unique=True,
+            )
+        ]
+
+
+def _rollup_keys(log: Log) -> Iterable[tuple]:
+    group_root = log.group_path[0] if log.group_path else None
+    for granularity in RollupGranularity:
+        yield (
+            granularity.value,
+            granularity.truncate(log.created_at),
+            log.tenant,
+            log.level.value,
+            log.tag,
+            group_root,
+        )
+
+
+async def _increment(key: tuple, count: int) -> None:
+    collection = MongoRollupDocument.get_motor_collection()
+    query = dict(zip(ROLLUP_KEY, key))
+    try:
+        await collection.update_one(query, {"$inc": {"total": count}}, upsert=True)
+    except DuplicateKeyError:
+        # a concurrent upsert created the counter first; it exists now
+        await collection.update_one(query, {"$inc": {"total": count}})
+
+
+async def record_rollups(logs: List[Log]) -> None:
+    """
+    Adds the logs to the counters of their buckets; logs sharing a bucket and dimensions cost a single update.
+    """
+    counts = Counter(key for log in logs for key in _rollup_keys(log))
+    await asyncio.gather(*(_increment(key, count) for key, count in counts.items()))
+
+
+async def record_rollups_safely(logs: List[Log]) -> None:
+    """
+    Same as `record_rollups`, but failures are only logged: the logs are stored already,
+    and failing their insertion would make the clients send them again.
+    """
+    try:
+        await record_rollups(logs)
+    except Exception:
+        logging.exception(f"❌ Failed to update the rollups of {len(logs)} logs.")
+
+
+async def query_rollups(
+    granularity: RollupGranularity,
+    since: datetime,
+    until: datetime,
+    tenant: Optional[str] = None,
+    levels: Optional[List[Level]] = None,
+    tag: Optional[str] = None,
+    group_root: Optional[str] = None,
+    by: Optional[StatsDimension] = None,
+) -> List[dict]:
+    match = {
+        "granularity": granularity.value,
+        "bucket": {"$gte": granularity.truncate(since), "$lt": until},
+    }
+    if tenant is not None:
+        match["tenant"] = tenant
+    if levels:
+        match["level"] = {"$in": [level.value for level in levels]}
+    if tag is not None:
+        match["tag"] = tag
+    if group_root is not None:
+        match["group_root"] = group_root
+
+    group_id = {"bucket": "$bucket"}
+    if by is not None:
+        group_id["key"] = f"${by}"
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": group_id, "count": {"$sum": "$total"}}},
+        {"$sort": {"_id.bucket": 1, "_id.key": 1}},
+    ]
+    collection = MongoRollupDocument.get_motor_collection()
+    return [
+        {
+            "bucket": row["_id"]["bucket"],
+            "key": row["_id"].get("key"),
+            "count": row["count"],
+        }
+        async for row in collection.aggregate(pipeline)
+    ]
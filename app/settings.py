@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import model_validator
 
@@ -21,10 +21,93 @@ class Settings(BaseSettings):
     DB_ADDRESS: str
     DB_NAME: str
     NON_BLOCKING_AVAILABLE: bool = False
+    # How init_db builds the declared indexes: before serving ("foreground"), while serving ("background") or not at all ("skip")
+    DB_INDEX_BUILD: Literal["foreground", "background", "skip"] = "foreground"
+    # "standard" stores the logs in the `logs` collection, "timeseries" in the `logs_timeseries` time-series collection
+    LOG_STORAGE: Literal["standard", "timeseries"] = "standard"
+    TIMESERIES_GRANULARITY: Literal["seconds", "minutes", "hours"] = "seconds"
+    TIMESERIES_EXPIRE_AFTER: Optional[int] = None  # seconds; logs are kept forever if not set
 
     # Optional unless NON_BLOCKING_AVAILABLE is true
     MQ_URL: Optional[str] = None
     QUEUE_NAME: Optional[str] = None
+    MQ_CONNECTION_POOL_SIZE: int = 2
+    MQ_CHANNEL_POOL_SIZE: int = 10
+    MQ_CONFIRM_BATCH_SIZE: int = 100
+    # "celery" for the celery worker, "native" for the asyncio consumer (python -m queues.consumer)
+    MQ_CONSUMER: Literal["celery", "native"] = "celery"
+    MQ_PREFETCH_COUNT: int = 1000
+    CONSUMER_BATCH_SIZE: int = 500
+    CONSUMER_BATCH_TIMEOUT: float = 1.0
+    BROKER_HEALTH_INTERVAL: float = 5.0
+    BROKER_HEALTH_TIMEOUT: float = 2.0
+    BROKER_FAILURE_THRESHOLD: int = 3
+    BROKER_RESET_TIMEOUT: float = 10.0
+
+    # Local disk spool, used by the non-blocking endpoints when the broker or the database is down
+    SPOOL_ENABLED: bool = False
+    SPOOL_DIR: str = "spool"
+    SPOOL_SEGMENT_SIZE: int = 16 * 1024 * 1024
+    SPOOL_QUOTA: int = 1024 * 1024 * 1024
+    SPOOL_FSYNC: Literal["always", "interval", "never"] = "interval"
+    SPOOL_FSYNC_INTERVAL: float = 1.0
+    SPOOL_REPLAY_INTERVAL: float = 5.0
+    SPOOL_REPLAY_BATCH_SIZE: int = 500
+
+    # Ingestion
+    BATCH_MAX_SIZE: int = 1000
+    NDJSON_BATCH_SIZE: int = 500
+    NDJSON_MAX_LINE_SIZE: int = 1024 * 1024
+    COMPRESSION_MIN_SIZE: int = 1024
+    DECOMPRESSED_MAX_SIZE: int = 64 * 1024 * 1024  # bytes of a compressed request body, once decompressed
+    BUFFER_MAX_SIZE: int = 10000
+    BUFFER_BATCH_SIZE: int = 500
+    BUFFER_FLUSH_INTERVAL: float = 1.0
+    CELERY_BATCH_SIZE: int = 500
+
+    # Admission control; above these watermarks, ingest requests are rejected with 429
+    ADMISSION_SYNC_MAX_IN_FLIGHT: int = 256  # inserts
+    ADMISSION_BATCH_MAX_IN_FLIGHT: int = 20000  # logs
+    ADMISSION_NDJSON_MAX_IN_FLIGHT: int = 16  # streams
+    ADMISSION_NON_BLOCKING_MAX_IN_FLIGHT: int = 512  # publishes
+    ADMISSION_BUFFER_HIGH_WATERMARK: int = 8000  # buffered logs
+    ADMISSION_RETRY_AFTER: int = 1  # seconds
+
+    # Totals of the list endpoints; "exact" counts the matching logs, "estimated" uses the collection metadata
+    # or a count bounded by COUNT_ESTIMATE_LIMIT, "none" skips the count
+    COUNT_MODE: Literal["exact", "estimated", "none"] = "exact"
+    COUNT_ESTIMATE_LIMIT: int = 10000
+    COUNT_CACHE_TTL: float = 5.0  # seconds; 0 disables the cache
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+    # Pages of the list endpoints, cached until a matching log is stored; 0 disables the cache
+    RESULT_CACHE_TTL: float = 5.0  # seconds
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    # Logs cached by uid: the unknown uids are cached too, for a shorter time
+    LOG_CACHE_MAX_ENTRIES: int = 10000
+    LOG_CACHE_TTL: float = 300.0
+    LOG_CACHE_MISSING_TTL: float = 1.0
+    # Whether searches hint the index that suits their predicates, instead of leaving the choice to the query planner
+    SEARCH_INDEX_HINT: bool = True
+    # "text" searches the payloads through a text index, ranked by relevance; "regex" matches every term with a regular expression
+    FULL_TEXT_SEARCH: Literal["text", "regex"] = "text"
+    SEARCH_TEXT_MAX_SIZE: int = 4096  # characters of each log indexed for the full-text search
+
+    # Per-minute and per-hour counters of the stored logs, answering the statistics endpoint
+    ROLLUPS_ENABLED: bool = True
+    STATS_DEFAULT_BUCKETS: int = 60
+    STATS_MAX_BUCKETS: int = 1440
+
+    # Streaming exports: logs fetched from the database per round trip, and bytes written to the response at once
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_SIZE: int = 64 * 1024
+
+    # Live tail: "local" publishes the logs stored by this process; "change_stream" watches the logs stored by any process
+    # (it needs a replica set, and the standard storage mode)
+    TAIL_SOURCE: Literal["local", "change_stream"] = "local"
+    TAIL_QUEUE_SIZE: int = 1000  # logs a subscriber may fall behind before it is dropped
+    TAIL_MAX_SUBSCRIBERS: int = 100
+    TAIL_HEARTBEAT_INTERVAL: float = 15.0  # seconds of silence before a keep-alive is sent
+    TAIL_CHANGE_STREAM_RETRY_INTERVAL: float = 5.0
 
     # additional fields
     app_name: str = "LogWell-service"
@@ -2,6 +2,7 @@ from repositories.mongo_repository import MongoLogRepository
 from logs.models import Log
 from database import init_db
 from celery import shared_task
+from celery.signals import worker_process_init, worker_process_shutdown
 import asyncio
 import logging
 import traceback
@@ -9,19 +10,80 @@ from settings import settings
 
 repo = MongoLogRepository()
 
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the event loop of the worker process. The loop and the database client are created once
+    (when the worker process starts, or on the first task) and are reused by all the following tasks.
+    If the database cannot be initialized, the loop is discarded, so that the next task tries again.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(
+                # the indexes are managed by the API service
+                init_db(
+                    db_address=settings.DB_ADDRESS,
+                    db_name=settings.DB_NAME,
+                    index_build="skip",
+                )
+            )
+        except Exception:
+            loop.close()
+            raise
+        _loop = loop
+    return _loop
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    try:
+        _get_loop()
+    except Exception:
+        # the first task will try again
+        logging.exception("❌ Failed to initialize the worker process.")
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.close()
+    _loop = None
+
 
 @shared_task
 def create_log_task(log_data: dict):
     try:
-        asyncio.run(_save_log(log_data))
+        _get_loop().run_until_complete(_save_log(log_data))
     except Exception as e:
         logging.error(f"Error in create_log_task: {e}")
         logging.error(traceback.format_exc())
 
 
+@shared_task
+def create_logs_batch_task(log_data_list: list[dict]):
+    try:
+        _get_loop().run_until_complete(_save_logs(log_data_list))
+    except Exception as e:
+        logging.error(f"Error in create_logs_batch_task: {e}")
+        logging.error(traceback.format_exc())
+
+
 async def _save_log(log_data: dict):
-    await init_db(db_address=settings.DB_ADDRESS, db_name=settings.DB_NAME)
     log = Log(**log_data)
 
     logging.info(await repo.insert(log))
     logging.info(f"Log added: {log.model_dump()}")
+
+
+async def _save_logs(log_data_list: list[dict]):
+    logs = [Log(**log_data) for log_data in log_data_list]
+
+    failed = await repo.insert_many(logs)
+    for index, reason in failed.items():
+        logging.error(f"Failed to add log {logs[index].uid}: {reason}")
+    logging.info(f"{len(logs) - len(failed)} logs added.")
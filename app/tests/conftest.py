@@ -4,10 +4,17 @@ from typing import Literal
 os.environ["DB_ADDRESS"] = "mongodb://localhost:27017"
 os.environ["DB_NAME"] = "test_db"
 os.environ["allowed_keys"] = '["key1"]'
+# mongomock does not support index hints nor text indexes
+os.environ["SEARCH_INDEX_HINT"] = "false"
+os.environ["FULL_TEXT_SEARCH"] = "regex"
 
 
 from beanie import init_beanie
 from repositories.mongo_repository import MongoLogDocument, MongoLogRepository
+from repositories.count_cache import get_count_cache
+from repositories.log_cache import get_log_cache
+from repositories.result_cache import get_result_cache
+from repositories.rollups import MongoRollupDocument
 import pytest_asyncio
 import pytest
 from logs.schemas import LogCreateSchema
@@ -38,7 +45,13 @@ async def init_test_db():
 
     mock_client = AsyncMongoMockClient()
     db = mock_client["test_db"]
-    await init_beanie(database=db, document_models=[MongoLogDocument])
+    await init_beanie(
+        database=db, document_models=[MongoLogDocument, MongoRollupDocument]
+    )
+    # cached counts belong to the previous test's database
+    get_count_cache().clear()
+    get_log_cache().clear()
+    get_result_cache().clear()
 
 
 @pytest.fixture
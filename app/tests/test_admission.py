@@ -0,0 +1,77 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException, status
+from logs.admission import AdmissionController, get_admission_controller
+from logs.schemas import LogCreateSchema
+from main import app
+
+
+def test_admission_rejects_above_watermark():
+    """
+    Test to verify that work above the watermark of a path is rejected with 429, while other paths are unaffected.
+    """
+    controller = AdmissionController(limits={"sync": 2, "batch": 10}, retry_after=3)
+
+    with controller.admit("sync"), controller.admit("sync"):
+        with pytest.raises(HTTPException) as exc_info:
+            with controller.admit("sync"):
+                pass
+        with controller.admit("batch", 10):
+            pass
+
+    assert exc_info.value.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert exc_info.value.headers["Retry-After"] == "3"
+    assert controller.in_flight == {"sync": 0, "batch": 0}
+    assert controller.rejected == {"sync": 1}
+
+
+def test_admission_admits_oversized_work_when_idle():
+    controller = AdmissionController(limits={"batch": 10})
+
+    with controller.admit("batch", 50):
+        assert controller.in_flight["batch"] == 50
+
+
+def test_admission_rejects_above_buffer_watermark():
+    controller = AdmissionController(limits={}, buffer_high_watermark=5)
+
+    controller.admit_buffered(4)
+    with pytest.raises(HTTPException):
+        controller.admit_buffered(5)
+
+
+async def test_post_log_too_many_requests(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict, mocker
+):
+    """
+    Test to verify that the log creation endpoint answers 429, with a Retry-After header,
+    once too many inserts are in flight.
+    """
+    controller = AdmissionController(limits={"sync": 1})
+    app.dependency_overrides[get_admission_controller] = lambda: controller
+    release = asyncio.Event()
+
+    async def slow_insert(log):
+        await release.wait()
+
+    mocker.patch(
+        "repositories.mongo_repository.MongoLogRepository.insert", side_effect=slow_insert
+    )
+
+    first = asyncio.create_task(
+        client.post("/logs/", json=test_log_schema.model_dump(), headers=header("valid"))
+    )
+    while not controller.in_flight["sync"]:
+        await asyncio.sleep(0.01)
+
+    response = await client.post(
+        "/logs/", json=test_log_schema.model_dump(), headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["retry-after"] == str(controller.retry_after)
+
+    release.set()
+    assert (await first).status_code == status.HTTP_201_CREATED
+
+    app.dependency_overrides.clear()
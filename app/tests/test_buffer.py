@@ -0,0 +1,71 @@
+import asyncio
+from logs.buffer import LogWriteBuffer
+from logs.models import Log
+from logs.schemas import LogCreateSchema
+from repositories.mongo_repository import MongoLogRepository
+
+
+async def test_buffer_flush(test_log_schema: LogCreateSchema, repo: MongoLogRepository):
+    """
+    Test to verify that the buffered logs are written to the repository on flush.
+    """
+    log_buffer = LogWriteBuffer(repo, max_size=10, batch_size=4)
+    for _ in range(6):
+        assert log_buffer.add(Log(**test_log_schema.model_dump()))
+    assert log_buffer.pending == 6
+
+    await log_buffer.flush()
+
+    _, total = await repo.all()
+    assert total == 6
+    assert log_buffer.stats()["pending"] == 0
+    assert log_buffer.stats()["flushed"] == 6
+
+
+async def test_buffer_drops_when_full(test_log_schema: LogCreateSchema, repo: MongoLogRepository):
+    """
+    Test to verify that the buffer rejects logs once it is full, instead of growing unbounded.
+    """
+    log_buffer = LogWriteBuffer(repo, max_size=2, batch_size=10)
+    results = [log_buffer.add(Log(**test_log_schema.model_dump())) for _ in range(3)]
+
+    assert results == [True, True, False]
+    assert log_buffer.stats()["dropped"] == 1
+
+
+async def test_buffer_flushes_on_batch_size(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository
+):
+    """
+    Test to verify that a running buffer flushes as soon as a full batch is pending,
+    without waiting for the flush interval.
+    """
+    log_buffer = LogWriteBuffer(repo, max_size=10, batch_size=2, flush_interval=60)
+    log_buffer.start()
+    try:
+        log_buffer.add(Log(**test_log_schema.model_dump()))
+        log_buffer.add(Log(**test_log_schema.model_dump()))
+        for _ in range(50):
+            if log_buffer.flushed == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert log_buffer.flushed == 2
+    finally:
+        await log_buffer.stop()
+
+
+async def test_buffer_stop_flushes_pending(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository
+):
+    """
+    Test to verify that stopping the buffer writes the logs that are still pending.
+    """
+    log_buffer = LogWriteBuffer(repo, max_size=10, batch_size=5, flush_interval=60)
+    log_buffer.start()
+    log_buffer.add(Log(**test_log_schema.model_dump()))
+
+    await log_buffer.stop()
+
+    _, total = await repo.all()
+    assert total == 1
+    assert log_buffer.pending == 0
@@ -0,0 +1,52 @@
+import json
+from fastapi.encoders import jsonable_encoder
+from logs.schemas import LogCreateSchema
+from queues.consumer import LogConsumer
+from repositories.mongo_repository import MongoLogRepository
+
+
+def make_message(mocker, body: bytes):
+    message = mocker.MagicMock()
+    message.body = body
+    message.ack = mocker.AsyncMock()
+    message.nack = mocker.AsyncMock()
+    message.reject = mocker.AsyncMock()
+    return message
+
+
+async def test_process_batch_stores_and_acks(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that a batch of deliveries is stored with a single bulk insert
+    and acknowledged at once, while malformed messages are rejected.
+    """
+    body = json.dumps(jsonable_encoder(test_log_schema.model_dump())).encode()
+    messages = [make_message(mocker, body) for _ in range(3)]
+    malformed = make_message(mocker, b"not json")
+    insert_many_spy = mocker.spy(repo, "insert_many")
+
+    await LogConsumer(repo).process_batch(messages[:2] + [malformed] + messages[2:])
+
+    insert_many_spy.assert_awaited_once()
+    malformed.reject.assert_awaited_once_with(requeue=False)
+    messages[-1].ack.assert_awaited_once_with(multiple=True)
+    _, total = await repo.all()
+    assert total == 3
+
+
+async def test_process_batch_requeues_on_failure(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that deliveries are not acknowledged, but requeued, if the bulk insert fails.
+    """
+    body = json.dumps(jsonable_encoder(test_log_schema.model_dump())).encode()
+    messages = [make_message(mocker, body) for _ in range(2)]
+    mocker.patch.object(repo, "insert_many", side_effect=ConnectionError())
+
+    await LogConsumer(repo).process_batch(messages)
+
+    messages[-1].nack.assert_awaited_once_with(multiple=True, requeue=True)
+    for message in messages:
+        message.ack.assert_not_awaited()
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from logs.events import LogEventBus, log_matches
+from logs.filters import LogFilter
+from logs.models import Level, Log
+
+
+def test_log_matches():
+    """
+    Test to verify that the subscriptions match the tenant, the levels, the tag and the group path prefix.
+    """
+    log = Log(tenant="t", level=Level.ERROR, tag="tag", group_path=["root", "a", "b"])
+
+    assert log_matches(LogFilter(), log)
+    assert log_matches(
+        LogFilter(tenant="t", levels=[Level.ERROR, Level.FATAL], group_path=["root"]),
+        log,
+    )
+    assert log_matches(LogFilter(group_path=["root", "a", "b"]), log)
+    assert not log_matches(LogFilter(tenant="other"), log)
+    assert not log_matches(LogFilter(levels=[Level.INFO]), log)
+    assert not log_matches(LogFilter(tag="other"), log)
+    assert not log_matches(LogFilter(group_path=["root", "b"]), log)
+    assert not log_matches(LogFilter(group_path=["root"]), Log())
+
+
+async def test_bus_publishes_to_matching_subscriptions():
+    """
+    Test to verify that the published logs reach the subscriptions whose filters they match, only.
+    """
+    bus = LogEventBus()
+    errors = bus.subscribe(LogFilter(levels=[Level.ERROR]))
+    everything = bus.subscribe(LogFilter())
+
+    info, error = Log(level=Level.INFO), Log(level=Level.ERROR)
+    bus.publish([info, error])
+
+    assert (await errors.get(timeout=1)).uid == error.uid
+    assert (await everything.get(timeout=1)).uid == info.uid
+    assert (await everything.get(timeout=1)).uid == error.uid
+    with pytest.raises(asyncio.TimeoutError):
+        await errors.get(timeout=0.01)
+
+
+async def test_bus_drops_slow_subscriptions():
+    """
+    Test to verify that a subscription falling too far behind is dropped, without affecting the others.
+    """
+    bus = LogEventBus(max_queue_size=2)
+    slow = bus.subscribe(LogFilter())
+    other = bus.subscribe(LogFilter(tenant="other"))
+
+    bus.publish([Log() for _ in range(3)])
+
+    assert slow.dropped
+    assert await slow.get(timeout=1) is None
+    assert bus.subscribers == 1
+    assert bus.stats()["dropped_subscribers"] == 1
+    assert not other.dropped
+
+
+def test_bus_limits_subscriptions():
+    """
+    Test to verify that the bus rejects subscriptions beyond its limit, until one is released.
+    """
+    bus = LogEventBus(max_subscribers=1)
+    subscription = bus.subscribe(LogFilter())
+
+    assert bus.subscribe(LogFilter()) is None
+    bus.unsubscribe(subscription)
+    assert bus.subscribe(LogFilter()) is not None
@@ -0,0 +1,60 @@
+from repositories.indexes import index_report, sync_indexes
+from repositories.mongo_repository import MongoLogDocument, MongoLogRepository
+from logs.models import Log
+from repositories.rollups import MongoRollupDocument
+
+
+async def test_index_report(mocker):
+    """
+    Test to verify that the index report lists the missing, undeclared and unused indexes.
+    """
+    collection = MongoLogDocument.get_motor_collection()
+    await collection.drop_index("tag_created_at")
+    await collection.create_index("metadata.trace", name="trace")
+    mocker.patch(
+        "repositories.indexes._index_usage",
+        new_callable=mocker.AsyncMock,
+        return_value={"uid": 12, "level_created_at": 3},
+    )
+
+    report = await index_report()
+
+    assert report["missing"] == ["tag_created_at"]
+    assert report["changed"] == []
+    assert report["undeclared"] == ["trace"]
+    assert "uid" not in report["unused"]
+    assert "trace" in report["unused"]
+
+    assert "tag_created_at" in await sync_indexes()
+    assert (await index_report())["missing"] == []
+
+
+async def test_rollup_indexes(mocker):
+    """
+    Test to verify that the indexes of the rollups are reported and built along with those of the logs.
+    """
+    collection = MongoRollupDocument.get_motor_collection()
+    await collection.drop_index("rollup_key")
+    mocker.patch(
+        "repositories.indexes._index_usage",
+        new_callable=mocker.AsyncMock,
+        return_value=None,
+    )
+
+    assert (await index_report(MongoRollupDocument))["missing"] == ["rollup_key"]
+    assert "rollup_key" in await sync_indexes()
+    assert (await index_report(MongoRollupDocument))["missing"] == []
+
+
+async def test_unique_uid_index(repo: MongoLogRepository):
+    """
+    Test to verify that the uid index rejects duplicates, which are reported as failed by the bulk insert.
+    """
+    log = Log(tag="duplicated")
+    await repo.insert(log)
+
+    failed = await repo.insert_many([Log(tag="new"), log])
+
+    assert list(failed) == [1]
+    _, total = await repo.all()
+    assert total == 2
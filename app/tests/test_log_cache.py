@@ -0,0 +1,38 @@
+from logs.models import Log
+from repositories.log_cache import MemoryLogCache
+
+
+async def test_log_cache_evicts_least_recently_used():
+    """
+    Test to verify that the cache keeps at most `max_entries` logs, evicting the least recently used first.
+    """
+    cache = MemoryLogCache(max_entries=2)
+    first, second, third = Log(), Log(), Log()
+    await cache.set_many([first, second])
+    assert await cache.get(first.uid) == (True, first)
+
+    await cache.set_many([third])
+
+    assert await cache.get(second.uid) == (False, None)
+    assert (await cache.get(first.uid))[0]
+    assert (await cache.get(third.uid))[0]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+async def test_log_cache_expires_missing_uids():
+    """
+    Test to verify that the unknown uids are cached according to their own ttl, and are overridden once stored.
+    """
+    cache = MemoryLogCache(missing_ttl=60)
+    log = Log()
+    await cache.set_missing(log.uid)
+    assert await cache.get(log.uid) == (True, None)
+
+    await cache.set_many([log])
+    assert await cache.get(log.uid) == (True, log)
+
+    cache = MemoryLogCache(ttl=60, missing_ttl=0)
+    await cache.set_missing(log.uid)
+    assert await cache.get(log.uid) == (False, None)
@@ -0,0 +1,147 @@
+import gzip
+import httpx
+import msgpack
+import zstandard
+from fastapi import status
+from logs.models import Log
+from logs.schemas import LogCreateSchema
+from negotiation import negotiate_media_type
+
+
+def test_negotiate_media_type():
+    assert negotiate_media_type(None) == "application/json"
+    assert negotiate_media_type("application/msgpack") == "application/msgpack"
+    assert negotiate_media_type("application/json, application/x-msgpack") == "application/json"
+    assert (
+        negotiate_media_type("application/json;q=0.5, application/msgpack")
+        == "application/msgpack"
+    )
+
+
+async def test_create_log_compressed_body(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that gzip and zstd compressed request bodies are decompressed transparently.
+    """
+    body = test_log_schema.model_dump_json().encode()
+    for encoding, compressed in (
+        ("gzip", gzip.compress(body)),
+        ("zstd", zstandard.ZstdCompressor().compress(body)),
+    ):
+        response = await client.post(
+            "/logs/",
+            content=compressed,
+            headers=header("valid")
+            | {"Content-Type": "application/json", "Content-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json().get("data").get("tag") == test_log_schema.tag
+
+
+async def test_create_log_unsupported_encoding(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    response = await client.post(
+        "/logs/",
+        content=test_log_schema.model_dump_json(),
+        headers=header("valid")
+        | {"Content-Type": "application/json", "Content-Encoding": "br"},
+    )
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+
+async def test_create_logs_msgpack(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that MessagePack bodies are accepted, and MessagePack responses are returned when asked for.
+    """
+    body = msgpack.packb([test_log_schema.model_dump(mode="json")] * 2)
+
+    response = await client.post(
+        "/logs/batch/",
+        content=body,
+        headers=header("valid")
+        | {"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content).get("accepted") == 2
+
+
+async def test_read_log_list_compressed(
+    client: httpx.AsyncClient, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that large list responses are compressed with the encoding accepted by the client.
+    """
+    for encoding in ("zstd", "gzip"):
+        response = await client.get(
+            "/logs/?limit=100",
+            headers=header("valid") | {"Accept-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == encoding
+        assert len(response.json().get("data")) == len(test_create_log_list)
+
+    response = await client.get(
+        "/logs/?limit=100",
+        headers=header("valid") | {"Accept": "application/msgpack"},
+    )
+    assert len(msgpack.unpackb(response.content).get("data")) == len(test_create_log_list)
+
+
+async def test_create_logs_ndjson_compressed(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that compressed NDJSON streams are decompressed incrementally.
+    """
+    body = gzip.compress(b"\n".join([test_log_schema.model_dump_json().encode()] * 3))
+
+    response = await client.post(
+        "/logs/ndjson/",
+        content=body,
+        headers=header("valid")
+        | {"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json().get("accepted") == 3
+
+
+async def test_create_logs_ndjson_corrupt_body(client: httpx.AsyncClient, header: dict):
+    """
+    Test to verify that corrupt compressed NDJSON streams are rejected with 400.
+    """
+    for encoding in ("gzip", "deflate", "zstd"):
+        response = await client.post(
+            "/logs/ndjson/",
+            content=b"\x1f\x8b\x08\x00not compressed at all" * 10,
+            headers=header("valid")
+            | {"Content-Type": "application/x-ndjson", "Content-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_create_logs_ndjson_decompression_bomb(
+    client: httpx.AsyncClient, header: dict, monkeypatch
+):
+    """
+    Test to verify that compressed NDJSON streams expanding beyond DECOMPRESSED_MAX_SIZE are rejected with 413.
+    """
+    from settings import settings
+
+    monkeypatch.setattr(settings, "DECOMPRESSED_MAX_SIZE", 64 * 1024)
+    body = b"\n" * (16 * 1024 * 1024)
+    for encoding, compressed in (
+        ("gzip", gzip.compress(body)),
+        ("zstd", zstandard.ZstdCompressor().compress(body)),
+    ):
+        response = await client.post(
+            "/logs/ndjson/",
+            content=compressed,
+            headers=header("valid")
+            | {"Content-Type": "application/x-ndjson", "Content-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
@@ -0,0 +1,103 @@
+import pytest
+from queues.health import BrokerHealthMonitor, CircuitBreaker, CircuitState
+from queues.rabbitmq_queue import RabbitMQLogQueue
+
+
+@pytest.fixture
+def amqp_mocks(mocker):
+    """
+    Mocks aio-pika's robust connection, so that the RabbitMQ queue can be tested without a broker.
+    """
+    channel = mocker.MagicMock()
+    channel.declare_queue = mocker.AsyncMock()
+    channel.default_exchange.publish = mocker.AsyncMock()
+    channel.close = mocker.AsyncMock()
+
+    connection = mocker.MagicMock()
+    connection.channel = mocker.AsyncMock(return_value=channel)
+    connection.close = mocker.AsyncMock()
+
+    connect_mock = mocker.patch(
+        "queues.rabbitmq_queue.connect_robust",
+        new_callable=mocker.AsyncMock,
+        return_value=connection,
+    )
+    return connect_mock, connection, channel
+
+
+async def test_enqueue_reuses_connection_and_channel(amqp_mocks):
+    """
+    Test to verify that consecutive enqueues share the pooled connection and channel,
+    and that the queue is declared only once.
+    """
+    connect_mock, connection, channel = amqp_mocks
+    queue = RabbitMQLogQueue(url="amqp://test/", queue_name="test_queue")
+
+    for i in range(3):
+        await queue.enqueue({"log": i})
+
+    connect_mock.assert_awaited_once()
+    connection.channel.assert_awaited_once_with(publisher_confirms=True)
+    channel.declare_queue.assert_awaited_once_with("test_queue", durable=True)
+    assert channel.default_exchange.publish.await_count == 3
+
+    await queue.close()
+
+
+async def test_enqueue_many(amqp_mocks):
+    """
+    Test to verify that enqueue_many publishes every log in confirm batches.
+    """
+    _, _, channel = amqp_mocks
+    queue = RabbitMQLogQueue(
+        url="amqp://test/", queue_name="test_queue", confirm_batch_size=2
+    )
+
+    await queue.enqueue_many([{"log": i} for i in range(5)])
+
+    assert channel.default_exchange.publish.await_count == 5
+    for call in channel.default_exchange.publish.await_args_list:
+        assert call.kwargs["routing_key"] == "test_queue"
+
+    await queue.close()
+
+
+def test_circuit_breaker_opens_and_recovers(mocker):
+    """
+    Test to verify that the circuit opens after the failure threshold, becomes half-open
+    after the reset timeout and closes again on success.
+    """
+    monotonic_mock = mocker.patch("queues.health.time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    monotonic_mock.return_value = 111.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    monotonic_mock.return_value = 122.0
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_broker_monitor_caches_reachability(mocker):
+    """
+    Test to verify that the broker is probed only once, and not on every availability check.
+    """
+    celery_app_mock = mocker.Mock()
+    celery_app_mock.connection_or_acquire.return_value = mocker.MagicMock()
+    monitor = BrokerHealthMonitor(celery_app_mock)
+
+    assert await monitor.is_available()
+    assert await monitor.is_available()
+
+    celery_app_mock.connection_or_acquire.assert_called_once()
+    assert monitor.stats()["circuit"] == CircuitState.CLOSED
@@ -1,8 +1,10 @@
 from logs.routes import get_celery_app
+from logs.buffer import LogWriteBuffer, get_log_buffer
+from repositories.mongo_repository import MongoLogRepository, get_log_document
 import httpx
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
-from logs.schemas import LogCreateSchema
+from logs.schemas import LogCreateSchema, LogRetrieveSchema
 from logs.models import Log, Level
 from base_error import NotFoundError
 from main import app
@@ -21,6 +23,86 @@ async def test_create_log(
     assert response.status_code == status.HTTP_201_CREATED
 
 
+async def test_create_logs_batch(
+    client: httpx.Client, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that the POST endpoint for creating a batch of logs stores all of them
+    and reports the status of each one.
+    """
+    records = [test_log_schema.model_dump() for _ in range(5)]
+
+    response = await client.post("/logs/batch/", json=records, headers=header("valid"))
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json().get("accepted") == len(records)
+    assert all(item["status"] == "created" for item in response.json().get("data"))
+
+    response = await client.get("/logs/", headers=header("valid"))
+    assert response.json().get("total") == len(records)
+
+
+async def test_create_logs_batch_partial_failure(
+    client: httpx.Client, test_log_schema: LogCreateSchema, header: dict, mocker
+):
+    """
+    Test to verify that the POST endpoint for creating a batch of logs returns a 207 status code
+    along with the per-item status when some of the logs could not be stored.
+    """
+    records = [test_log_schema.model_dump() for _ in range(3)]
+    mocker.patch(
+        "repositories.mongo_repository.MongoLogRepository.insert_many",
+        return_value={1: "Duplicate key"},
+    )
+
+    response = await client.post("/logs/batch/", json=records, headers=header("valid"))
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert response.json().get("accepted") == 2
+    assert response.json().get("rejected") == 1
+    assert response.json().get("data")[1]["status"] == "failed"
+    assert response.json().get("data")[1]["detail"] == "Duplicate key"
+
+
+async def test_create_logs_batch_too_large(
+    client: httpx.Client, test_log_schema: LogCreateSchema, header: dict, mocker
+):
+    """
+    Test to verify that the POST endpoint for creating a batch of logs rejects batches
+    larger than the configured maximum.
+    """
+    mocker.patch("logs.services.settings.BATCH_MAX_SIZE", 2)
+    records = [test_log_schema.model_dump() for _ in range(3)]
+
+    response = await client.post("/logs/batch/", json=records, headers=header("valid"))
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+
+
+async def test_create_logs_ndjson(
+    client: httpx.Client, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that the POST endpoint for streaming NDJSON logs stores the valid lines
+    and reports the numbers of the rejected ones.
+    """
+    line = test_log_schema.model_dump_json().encode()
+    body = b"\n".join([line, b'{"level": "NOT_A_LEVEL"}', b"", line, b"not json", line])
+
+    async def chunks():
+        for i in range(0, len(body), 7):
+            yield body[i : i + 7]
+
+    response = await client.post(
+        "/logs/ndjson/",
+        content=chunks(),
+        headers=header("valid") | {"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert response.json().get("accepted") == 3
+    assert response.json().get("data") == [2, 5]
+
+    response = await client.get("/logs/", headers=header("valid"))
+    assert response.json().get("total") == 3
+
+
 async def test_read_valid_log_uid(client: httpx.Client, test_log: Log, header: dict):
     """
     Test to verify that the GET endpoint for retrieving a log by its uid successfully retrieves the log when given a valid uid.
@@ -32,6 +114,24 @@ async def test_read_valid_log_uid(client: httpx.Client, test_log: Log, header: d
     assert response.json().get("data").get("uid") == log.uid
 
 
+async def test_read_log_list_serialization(
+    client: httpx.Client, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that the logs read through the driver are rendered the same as
+    the documents hydrated by Beanie and validated against the response schema.
+    """
+    response = await client.get("/logs/", headers=header("valid"))
+    assert response.status_code == status.HTTP_200_OK
+    expected = {
+        doc.uid: jsonable_encoder(LogRetrieveSchema(**doc.to_log().model_dump()))
+        for doc in await get_log_document().find_all().to_list()
+    }
+    data = response.json().get("data")
+    assert len(data) == len(test_create_log_list)
+    assert {log["uid"]: log for log in data} == expected
+
+
 async def test_read_invalid_log_uid(client: httpx.Client, header: dict):
     """
     Test to verify that the GET endpoint for retrieving a log by its uid returns a 404
@@ -55,6 +155,51 @@ async def test_read_log_list(
     assert len(response.json().get("data")) == len(test_create_log_list)
 
 
+async def test_read_log_list_by_cursor(
+    client: httpx.Client, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that the list endpoints return a next_cursor in cursor mode, and reject invalid cursors.
+    """
+    response = await client.get("/logs/tag/test_tag?cursor=&limit=6", headers=header("valid"))
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json().get("data")
+    next_cursor = response.json().get("next_cursor")
+    assert next_cursor
+
+    response = await client.get(
+        f"/logs/tag/test_tag?cursor={next_cursor}&limit=6", headers=header("valid")
+    )
+    second_page = response.json().get("data")
+    assert len(first_page) + len(second_page) == len(test_create_log_list)
+    assert response.json().get("next_cursor") is None
+
+    # not base64, nor JSON; then valid JSON of the wrong shape (`5` and `[1, "x"]`)
+    for cursor in ("not-a-cursor", "NQ", "WzEsIngiXQ"):
+        response = await client.get(f"/logs/?cursor={cursor}", headers=header("valid"))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_read_log_list_count_modes(
+    client: httpx.Client, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that the total of the list endpoints can be estimated or skipped.
+    """
+    response = await client.get("/logs/?count=estimated", headers=header("valid"))
+    assert response.json().get("total") == len(test_create_log_list)
+    assert response.json().get("total_exact") is False
+
+    response = await client.get("/logs/", headers=header("valid"))
+    assert response.json().get("total") == len(test_create_log_list)
+    assert response.json().get("total_exact") is True
+
+    response = await client.get("/logs/tag/test_tag?count=none", headers=header("valid"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("total") is None
+    assert response.json().get("total_exact") is False
+
+
 async def test_read_log_list_with_tag(
     client: httpx.Client, test_create_log_list: list[Log], header: dict
 ):
@@ -101,6 +246,128 @@ async def test_read_log_list_with_empty_level(client: httpx.Client, header: dict
     assert len(response.json().get("data")) == 0
 
 
+async def test_read_log_list_cache_bypass(
+    client: httpx.Client, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that the list endpoints serve the cached pages, unless requested with `Cache-Control: no-cache`.
+    """
+    from repositories.mongo_repository import MongoLogDocument
+
+    response = await client.get(f"/logs/level/{Level.INFO}", headers=header("valid"))
+    assert response.json().get("total") == len(test_create_log_list)
+
+    # behind the back of the repository, so that the cached page is not invalidated
+    await MongoLogDocument.get_motor_collection().delete_many({})
+    response = await client.get(f"/logs/level/{Level.INFO}", headers=header("valid"))
+    assert response.json().get("total") == len(test_create_log_list)
+
+    response = await client.get(
+        f"/logs/level/{Level.INFO}",
+        headers={**header("valid"), "Cache-Control": "no-cache"},
+    )
+    assert response.json().get("data") == []
+
+
+async def test_read_log_list_not_modified(
+    client: httpx.Client,
+    test_log_schema: LogCreateSchema,
+    test_create_log_list: list[Log],
+    header: dict,
+):
+    """
+    Test to verify that the list endpoints answer with a 304 while the ETag sent back is current,
+    and with the new page once a matching log is stored.
+    """
+    response = await client.get("/logs/tag/test_tag?limit=5", headers=header("valid"))
+    etag = response.headers["etag"]
+
+    conditional = {**header("valid"), "If-None-Match": etag}
+    response = await client.get("/logs/tag/test_tag?limit=5", headers=conditional)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    response = await client.get("/logs/tag/test_tag?limit=6", headers=conditional)
+    assert response.status_code == status.HTTP_200_OK
+
+    await client.post(
+        "/logs/", json=jsonable_encoder(test_log_schema), headers=header("valid")
+    )
+    response = await client.get("/logs/tag/test_tag?limit=5", headers=conditional)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+
+async def test_read_log_list_not_modified_without_count(
+    client: httpx.Client,
+    test_log_schema: LogCreateSchema,
+    test_create_log_list: list[Log],
+    header: dict,
+    mocker,
+):
+    """
+    Test to verify that the ETags of the pages requested without a total do not count the logs,
+    while still changing as logs are stored, and that exact counts are served by the count cache.
+    """
+    from repositories.mongo_repository import MongoLogDocument
+
+    count_spy = mocker.spy(MongoLogDocument, "find")
+    etags = set()
+    for _ in range(3):
+        await client.post(
+            "/logs/", json=jsonable_encoder(test_log_schema), headers=header("valid")
+        )
+        response = await client.get("/logs/?count=none", headers=header("valid"))
+        assert response.status_code == status.HTTP_200_OK
+        etags.add(response.headers["etag"])
+    assert count_spy.call_count == 0
+    assert len(etags) == 3
+
+    await client.get("/logs/?count=exact", headers=header("valid"))
+    calls = count_spy.call_count
+    await client.get(
+        "/logs/?count=exact", headers={**header("valid"), "Cache-Control": "no-cache"}
+    )
+    assert count_spy.call_count == calls
+
+
+async def test_read_log_not_modified(
+    client: httpx.Client, test_log: Log, header: dict
+):
+    """
+    Test to verify that a log carries a strong, permanent ETag, honoured by If-None-Match.
+    """
+    response = await client.get(f"/logs/{test_log.uid}", headers=header("valid"))
+    assert response.headers["etag"] == f'"{test_log.uid}"'
+
+    response = await client.get(
+        f"/logs/{test_log.uid}",
+        headers={**header("valid"), "If-None-Match": f'W/"x", "{test_log.uid}"'},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+async def test_read_log_list_fields(
+    client: httpx.Client, test_create_log_list: list[Log], header: dict
+):
+    """
+    Test to verify that the read endpoints return only the requested fields, and reject unknown ones.
+    """
+    response = await client.get(
+        "/logs/?fields=uid,level&limit=3&cursor=", headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json().get("data")
+    assert [set(log) for log in data] == [{"uid", "level"}] * 3
+    assert response.json().get("next_cursor")
+
+    uid = data[0]["uid"]
+    response = await client.get(f"/logs/{uid}?fields=tag", headers=header("valid"))
+    assert response.json().get("data") == {"tag": "test_tag"}
+
+    response = await client.get("/logs/?fields=uid,secret", headers=header("valid"))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 async def test_read_log_list_with_invalid_level(client: httpx.Client, header: dict):
     """
     Test to verify that the GET endpoint for retrieving logs by level
@@ -149,20 +416,107 @@ async def test_read_log_list_with_group_path_children(
     assert len(response.json().get("data")) == len(grouped_logs)
 
 
-## The following test is not working because mongomock does not support such complex queries.
+async def test_read_log_list_with_empty_group_path_children(
+    client: httpx.Client, test_log: Log, header: dict
+):
+    """
+    Test to verify that the GET endpoint for retrieving logs by group path children
+    returns an empty list when the specified group path does not exist.
+    """
+
+    response = await client.get(
+        "/logs/group/empty-group-path/children/", headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json().get("data")) == 0
+
+
+async def test_search_logs(client: httpx.Client, grouped_logs: list[Log], header: dict):
+    """
+    Test to verify that the search endpoint combines the given criteria, and rejects an empty time range.
+    """
+    response = await client.get(
+        "/logs/search/?tenant=test_tenant&level=INFO&level=ERROR&group=root-section-child",
+        headers=header("valid"),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("total") == 2
+    assert {tuple(log["group_path"]) for log in response.json().get("data")} == {
+        ("root", "section", "child"),
+        ("root", "section", "child", "deep"),
+    }
 
-# async def test_read_log_list_with_empty_group_path_children(
-#     client: httpx.Client, test_log: Log
-# ):
+    response = await client.get(
+        "/logs/search/?q=DEEP+child&group=root", headers=header("valid")
+    )
+    assert response.json().get("total") == 1
 
-#     """
-#     Test to verify that the GET endpoint for retrieving logs by group path children
-#     returns an empty list when the specified group path does not exist.
-#     """
+    response = await client.get(
+        "/logs/search/?since=2024-01-02T00:00:00&until=2024-01-01T00:00:00",
+        headers=header("valid"),
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
-#     response = await client.get("/logs/group/empty-group-path/children/")
-#     assert response.status_code == status.HTTP_200_OK
-#     assert len(response.json().get("data")) == 0
+
+async def test_export_logs(client: httpx.Client, grouped_logs: list[Log], header: dict):
+    """
+    Test to verify that the export endpoint streams the matching logs as an attachment, optionally gzip-compressed.
+    """
+    import gzip
+
+    response = await client.get(
+        "/logs/export/?group=root-section-child", headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="logs.ndjson"' in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 2
+
+    response = await client.get(
+        "/logs/export/?format=csv&gzip=true", headers=header("valid")
+    )
+    assert response.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert lines[0].startswith("uid,created_at")
+    assert len(lines) == len(grouped_logs) + 1
+
+    response = await client.get(
+        "/logs/export/?since=2024-01-02T00:00:00&until=2024-01-01T00:00:00",
+        headers=header("valid"),
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+async def test_tail_logs_unavailable(client: httpx.Client, header: dict):
+    """
+    Test to verify that the live tail is refused with a 503 once too many tails are open.
+    """
+    from logs.events import LogEventBus, get_event_bus
+
+    app.dependency_overrides[get_event_bus] = lambda: LogEventBus(max_subscribers=0)
+
+    response = await client.get("/logs/tail/", headers=header("valid"))
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    app.dependency_overrides.clear()
+
+
+async def test_get_stats(client: httpx.Client, grouped_logs: list[Log], header: dict):
+    """
+    Test to verify that the stats endpoint returns the number of logs per bucket, and rejects too many buckets.
+    """
+    response = await client.get(
+        "/logs/stats/?granularity=hour&by=group_root", headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json().get("data")
+    assert {item["key"] for item in data} == {"root"}
+    assert sum(item["count"] for item in data) == len(grouped_logs)
+
+    response = await client.get(
+        "/logs/stats/?since=2020-01-01T00:00:00", headers=header("valid")
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 async def test_post_log_non_blocking_accepted(
@@ -213,3 +567,81 @@ async def test_post_log_non_blocking_service_unavailable(
     )
 
     assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+async def test_post_log_non_blocking_builtin_accepted(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that the POST endpoint for creating logs through the builtin non-blocking path
+    buffers the log and returns a 202 Accepted status code; the log is stored once the buffer is flushed.
+    """
+    log_buffer = LogWriteBuffer(MongoLogRepository())
+    app.dependency_overrides[get_log_buffer] = lambda: log_buffer
+
+    response = await client.post(
+        "/logs/non-blocking/builtin/",
+        json=test_log_schema.model_dump(),
+        headers=header("valid"),
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert log_buffer.pending == 1
+
+    await log_buffer.flush()
+    uid = response.json().get("data").get("uid")
+    response = await client.get(f"/logs/{uid}", headers=header("valid"))
+    assert response.status_code == status.HTTP_200_OK
+
+    app.dependency_overrides.clear()
+
+
+async def test_post_log_non_blocking_builtin_buffer_full(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, header: dict
+):
+    """
+    Test to verify that the builtin non-blocking endpoint returns a 503 status code when the buffer is full.
+    """
+    log_buffer = LogWriteBuffer(MongoLogRepository(), max_size=0)
+    app.dependency_overrides[get_log_buffer] = lambda: log_buffer
+
+    response = await client.post(
+        "/logs/non-blocking/builtin/",
+        json=test_log_schema.model_dump(),
+        headers=header("valid"),
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    response = await client.get("/logs/metrics/", headers=header("valid"))
+    assert response.json().get("data").get("buffer").get("dropped") == 1
+
+    app.dependency_overrides.clear()
+
+
+async def test_post_logs_batch_non_blocking_accepted(
+    client: httpx.AsyncClient, test_log_schema: LogCreateSchema, mocker, header: dict
+):
+    """
+    Test to verify that the POST endpoint for queueing a batch of logs
+    sends them to the worker in chunks of the configured batch size.
+    """
+    records = [test_log_schema.model_dump() for _ in range(5)]
+
+    celery_app_mock = mocker.Mock()
+    context_manager_mock = mocker.MagicMock()
+    context_manager_mock.__enter__.return_value = mocker.MagicMock()
+    celery_app_mock.connection_or_acquire.return_value = context_manager_mock
+
+    mocker.patch("logs.services.settings.CELERY_BATCH_SIZE", 2)
+    delay_mock = mocker.patch("tasks.create_logs_batch_task.delay")
+
+    app.dependency_overrides[get_celery_app] = lambda: celery_app_mock
+
+    response = await client.post(
+        "/logs/non-blocking/batch/", json=records, headers=header("valid")
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert delay_mock.call_count == 3
+    assert [len(call.args[0]) for call in delay_mock.call_args_list] == [2, 2, 1]
+
+    app.dependency_overrides.clear()
@@ -2,21 +2,27 @@ from fastapi.encoders import jsonable_encoder
 import pytest
 from logs.schemas import LogCreateSchema
 from logs.models import Level
+from logs.pagination import CountMode
 from repositories.mongo_repository import MongoLogRepository
 from logs.services import (
     create_log,
+    create_logs,
+    create_logs_stream,
     read_log,
     read_logs_list,
     read_logs_by_level,
     read_logs_by_tag,
     read_logs_by_group_path,
     read_logs_by_group_path_children,
+    read_logs_search,
+    read_stats,
     create_log_non_blocking,
 )
 from logs.models import Log
 from datetime import datetime
 import uuid
 from kombu.exceptions import OperationalError
+from fastapi import HTTPException
 
 
 async def test_create_log(
@@ -38,6 +44,46 @@ async def test_create_log(
     assert isinstance(uuid.UUID(log.uid), uuid.UUID)
 
 
+async def test_create_logs(test_log_schema: LogCreateSchema, repo: MongoLogRepository):
+    """
+    Test to verify that the create_logs function stores all the given logs with a single bulk write.
+    """
+    records = [test_log_schema.model_dump() for _ in range(4)]
+    logs, failed = await create_logs(records, repo)
+
+    assert failed == {}
+    assert len(logs) == len(records)
+    queried_logs, total = await read_logs_list(repo)
+    assert total == len(records)
+    assert {log.uid for log in logs} == {log.uid for log in queried_logs}
+
+
+async def test_create_logs_stream_batches(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that streamed logs are written in rolling batches and that overlong lines are rejected
+    without being buffered.
+    """
+    line = test_log_schema.model_dump_json().encode()
+
+    async def chunks():
+        for _ in range(5):
+            yield line + b"\n"
+        yield b'{"log": "' + b"x" * 600
+        yield b"x" * 300 + b'"}\n'
+        yield line
+
+    insert_many_spy = mocker.spy(repo, "insert_many")
+    accepted, rejected = await create_logs_stream(
+        chunks(), repo, batch_size=2, max_line_size=500
+    )
+
+    assert accepted == 6
+    assert rejected == [6]
+    assert [len(call.args[0]) for call in insert_many_spy.await_args_list] == [2, 2, 2]
+
+
 @pytest.mark.asyncio
 async def test_read_log(test_log: Log, repo: MongoLogRepository):
     """
@@ -49,6 +95,72 @@ async def test_read_log(test_log: Log, repo: MongoLogRepository):
     assert queried_log.uid == log.uid
 
 
+@pytest.mark.asyncio
+async def test_read_log_cached(test_log_schema: LogCreateSchema, mocker):
+    """
+    Test to verify that the logs are read through the cache, which is filled on insert,
+    and that the unknown uids are cached too.
+    """
+    from repositories.log_cache import MemoryLogCache
+
+    repo = MongoLogRepository(cache=MemoryLogCache())
+    log = await create_log(test_log_schema.model_dump(), repo)
+    reads = mocker.spy(repo, "_projection")
+
+    assert (await read_log(log.uid, repo)).uid == log.uid
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await read_log("unknown", repo)
+
+    assert reads.call_count == 1
+    assert repo.cache.stats()["hits"] == 2
+    assert repo.cache.stats()["misses"] == 1
+
+
+async def test_read_log_cached_stored_form(test_log_schema: LogCreateSchema):
+    """
+    Test to verify that the cached logs are read as the stored ones, and are not shared with the caller.
+    """
+    from repositories.log_cache import MemoryLogCache
+
+    log = Log(**test_log_schema.model_dump(), created_at=datetime(2024, 5, 1, 12, 0, 0, 123456))
+    repo = MongoLogRepository(cache=MemoryLogCache())
+    await repo.insert(log)
+    log.metadata["changed"] = True
+
+    cached = await read_log(log.uid, repo)
+    stored = await read_log(log.uid, MongoLogRepository(cache=MemoryLogCache()))
+    assert cached == stored
+    assert cached.created_at == datetime(2024, 5, 1, 12, 0, 0, 123000)
+    assert "changed" not in cached.metadata
+
+
+@pytest.mark.asyncio
+async def test_read_logs_fields(test_create_log_list: list[Log]):
+    """
+    Test to verify that the requested fields are pushed down as a projection, along with those identifying the pages.
+    """
+    from repositories.log_cache import MemoryLogCache
+
+    repo = MongoLogRepository(cache=MemoryLogCache(), cache_results=False)
+    assert repo._projection(["level"]) == {
+        "_id": 0,
+        "level": 1,
+        "uid": 1,
+        "created_at": 1,
+    }
+
+    logs, total = await read_logs_by_tag("test_tag", repo, limit=2, fields=["level"])
+    assert total == len(test_create_log_list)
+    assert [log.model_fields_set for log in logs] == [
+        {"level", "uid", "created_at"}
+    ] * 2
+
+    log = await read_log(logs[0].uid, repo, ["tag"])
+    assert log.model_fields_set == {"tag", "uid", "created_at"}
+    assert log.tag == "test_tag"
+
+
 @pytest.mark.asyncio
 async def test_read_logs_list(
     test_create_log_list: list[Log], repo: MongoLogRepository
@@ -59,6 +171,137 @@ async def test_read_logs_list(
     assert len(test_logs) == total
 
 
+@pytest.mark.asyncio
+async def test_read_logs_list_by_cursor(
+    test_create_log_list: list[Log], repo: MongoLogRepository
+):
+    """
+    Test to verify that cursor pagination walks through all the logs, newest first, without duplicates.
+    """
+    from logs.pagination import next_cursor
+
+    queried_logs, cursor = [], ""
+    while cursor is not None:
+        logs, total = await read_logs_list(repo, limit=3, cursor=cursor)
+        queried_logs.extend(logs)
+        cursor = next_cursor(logs, 3, cursor)
+
+    keys = [(log.created_at, log.uid) for log in queried_logs]
+    assert total == len(test_create_log_list)
+    assert sorted(log.uid for log in queried_logs) == sorted(
+        log.uid for log in test_create_log_list
+    )
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_read_logs_list_count_modes(
+    test_create_log_list: list[Log], repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the total is estimated beyond the count limit, and skipped when not requested.
+    """
+    from logs.pagination import CountMode, EstimatedCount
+
+    _, total = await read_logs_list(repo, count=CountMode.NONE)
+    assert total is None
+
+    _, total = await read_logs_list(repo, count=CountMode.ESTIMATED)
+    assert isinstance(total, EstimatedCount)
+    assert total == len(test_create_log_list)
+
+    # a bounded count stops at the limit; below it, it is exact
+    mocker.patch("repositories.mongo_repository.settings.COUNT_ESTIMATE_LIMIT", 5)
+    _, total = await read_logs_by_tag("test_tag", repo, count=CountMode.ESTIMATED)
+    assert isinstance(total, EstimatedCount)
+    assert total == 5
+    _, total = await read_logs_by_level(Level.CRITICAL, repo, count=CountMode.ESTIMATED)
+    assert total == 0
+    assert not isinstance(total, EstimatedCount)
+
+
+@pytest.mark.asyncio
+async def test_read_logs_cached_count(test_log_schema: LogCreateSchema, mocker):
+    """
+    Test to verify that exact counts are cached per filter and invalidated when matching logs are stored.
+    """
+    from repositories.mongo_repository import MongoLogDocument
+
+    repo = MongoLogRepository(cache_results=False)
+
+    await create_log(test_log_schema.model_dump(), repo)
+    _, total = await read_logs_by_tag("test_tag", repo)
+    assert total == 1
+
+    count_spy = mocker.spy(MongoLogDocument, "find")
+    _, total = await read_logs_by_tag("test_tag", repo)
+    assert total == 1
+    assert count_spy.call_count == 0  # the page is read through the driver
+
+    await create_logs([test_log_schema.model_dump()] * 2, repo)
+    _, total = await read_logs_by_tag("test_tag", repo)
+    assert total == 3
+
+
+@pytest.mark.asyncio
+async def test_read_logs_cached_results(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the pages are cached until a log of their dimension is stored, unless bypassed.
+    """
+    from repositories.result_cache import get_result_cache
+
+    await create_log(test_log_schema.model_dump(), repo)
+    logs, total = await read_logs_by_level("INFO", repo)
+    find_spy = mocker.spy(MongoLogRepository, "_query")
+
+    assert await read_logs_by_level("INFO", repo) == (logs, total)
+    assert find_spy.call_count == 0
+    assert get_result_cache().stats()["hits"] >= 1
+
+    await create_log({**test_log_schema.model_dump(), "level": Level.ERROR}, repo)
+    assert await read_logs_by_level("INFO", repo) == (logs, total)
+    assert find_spy.call_count == 0
+
+    await create_log(test_log_schema.model_dump(), repo)
+    _, total = await read_logs_by_level("INFO", repo)
+    assert total == 2
+
+    calls = find_spy.call_count
+    await read_logs_by_level("INFO", MongoLogRepository(cache_results=False))
+    assert find_spy.call_count > calls
+
+
+async def test_read_logs_etag(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the ETag of a page changes when an older log is stored,
+    and that it is answered from the cache until then.
+    """
+    from datetime import timedelta
+    from logs.filters import LogFilter
+    from logs.services import read_logs_etag
+
+    filters = LogFilter(tag=test_log_schema.tag)
+    stored = await create_log(test_log_schema.model_dump(), repo)
+    etag = await read_logs_etag(repo, filters, "/logs/", "application/json")
+    watermark_spy = mocker.spy(MongoLogRepository, "_watermark")
+
+    assert await read_logs_etag(repo, filters, "/logs/", "application/json") == etag
+    assert watermark_spy.call_count == 0
+
+    older = Log(
+        **test_log_schema.model_dump(),
+        created_at=stored.created_at - timedelta(minutes=5),
+    )
+    await repo.insert_many([older])
+    new_etag = await read_logs_etag(repo, filters, "/logs/", "application/json")
+    assert new_etag != etag
+    assert watermark_spy.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_read_logs_by_level(test_log: Log, repo: MongoLogRepository):
     log = test_log
@@ -115,11 +358,382 @@ async def test_read_logs_by_group_path_children(grouped_logs, repo: MongoLogRepo
     assert total
 
 
-# The following test is not working because mongomock does not support such complex queries.
-# @pytest.mark.asyncio
-# async def test_read_logs_by_empty_group_path_children(repo: MongoLogRepository):
-#     logs = await read_logs_by_group_path_children("non-existing-group-path", repo)
-#     assert len(logs) == 0
+@pytest.mark.asyncio
+async def test_read_logs_by_empty_group_path_children(
+    grouped_logs, repo: MongoLogRepository
+):
+    logs, total = await read_logs_by_group_path_children("root-sec", repo)
+    assert len(logs) == 0
+    assert total == 0
+
+
+async def test_read_logs_by_dimension_sort(grouped_logs, mocker):
+    """
+    Test to verify that the count mode of the dimension lookups is not mistaken for the sort of their pages.
+    """
+    import inspect
+
+    repo = MongoLogRepository(cache_results=False)
+    query_spy = mocker.spy(MongoLogRepository, "_query")
+    signature = inspect.signature(MongoLogRepository._query)
+
+    await repo.find_by_level(Level.INFO)
+    await repo.find_by_group_path(["root", "section"])
+    await repo.find_children_by_group_path(["root", "section"])
+
+    assert query_spy.call_count == 3
+    for call in query_spy.call_args_list:
+        arguments = signature.bind(*call.args, **call.kwargs).arguments
+        assert arguments.get("sort") is None
+        assert arguments["count"] == CountMode.EXACT
+
+
+@pytest.mark.asyncio
+async def test_backfill_group_ancestors(grouped_logs):
+    """
+    Test to verify that the migration backfills the group ancestors of the logs stored without them.
+    """
+    from repositories.backfill_group_ancestors import backfill_group_ancestors
+    from repositories.mongo_repository import MongoLogDocument
+
+    # the collection is updated behind the back of the repository
+    repo = MongoLogRepository(cache_results=False)
+
+    collection = MongoLogDocument.get_motor_collection()
+    await collection.update_many({}, {"$unset": {"group_ancestors": ""}})
+    logs, _ = await read_logs_by_group_path_children("root-section", repo)
+    assert len(logs) == 0
+
+    assert await backfill_group_ancestors(batch_size=2) == len(grouped_logs)
+    logs, _ = await read_logs_by_group_path_children("root-section", repo)
+    assert len(logs) == len(grouped_logs)
+
+
+@pytest.mark.asyncio
+async def test_read_logs_search(grouped_logs, repo: MongoLogRepository):
+    """
+    Test to verify that the search combines all the given predicates into a single query.
+    """
+    from datetime import timedelta
+    from logs.schemas import LogSearchSchema
+
+    other_tenant = Log(
+        tenant="other", level=Level.ERROR, group_path=["root", "section"]
+    )
+    error_log = Log(
+        tenant="test_tenant", level=Level.ERROR, group_path=["root", "section", "x"]
+    )
+    for log in (other_tenant, error_log):
+        await repo.insert(log)
+
+    search = LogSearchSchema(
+        tenant="test_tenant",
+        level=[Level.ERROR, Level.CRITICAL],
+        group="root-section",
+        since=datetime.now() - timedelta(hours=1),
+    )
+    logs, total = await read_logs_search(search, repo)
+    assert total == 1
+    assert logs[0].uid == error_log.uid
+
+    logs, total = await read_logs_search(LogSearchSchema(group="root-section"), repo)
+    assert total == len(grouped_logs) + 2
+
+    search = LogSearchSchema(
+        tenant="test_tenant", until=datetime.now() - timedelta(hours=1)
+    )
+    logs, total = await read_logs_search(search, repo)
+    assert total == 0
+
+
+@pytest.mark.asyncio
+async def test_read_logs_search_text(repo: MongoLogRepository):
+    """
+    Test to verify that the full-text search matches the logs whose payload or metadata contain all the given words.
+    """
+    from logs.schemas import LogSearchSchema
+
+    matching = [
+        Log(log="Payment FAILED for order 42", metadata={"request_id": "req-7f3a"}),
+        Log(
+            log={"error": {"message": "payment failed"}},
+            metadata={"request_id": "req-7f3a"},
+        ),
+    ]
+    others = [
+        Log(log="payment failed", metadata={"request_id": "req-0000"}),
+        Log(log={"event": "payment succeeded"}, metadata={"request_id": "req-7f3a"}),
+    ]
+    await repo.insert_many(matching + others)
+
+    logs, total = await read_logs_search(
+        LogSearchSchema(q="payment failed req-7f3a"), repo
+    )
+    assert total == len(matching)
+    assert {log.uid for log in logs} == {log.uid for log in matching}
+
+
+def test_search_text_query(monkeypatch):
+    """
+    Test to verify that every term of a text search must appear, as in the regex mode, and is matched literally.
+    """
+    from logs.filters import LogFilter
+    from repositories.mongo_repository import MongoLogDocument, _search_query
+    from settings import settings
+
+    monkeypatch.setattr(settings, "FULL_TEXT_SEARCH", "text")
+    query = _search_query(LogFilter(text='timeout db -42 say"hi'), MongoLogDocument)
+    assert query["$text"] == {"$search": '"timeout" "db" "-42" "say" "hi"'}
+    query = _search_query(LogFilter(text='"connection reset" db'), MongoLogDocument)
+    assert query["$text"] == {"$search": '"connection" "reset" "db"'}
+    assert "$text" not in _search_query(LogFilter(text='""'), MongoLogDocument)
+
+
+@pytest.mark.asyncio
+async def test_backfill_search_text(test_create_log_list, repo: MongoLogRepository):
+    """
+    Test to verify that the migration backfills the search text of the logs stored without it.
+    """
+    from logs.schemas import LogSearchSchema
+    from repositories.backfill_search_text import backfill_search_text
+    from repositories.mongo_repository import MongoLogDocument
+
+    collection = MongoLogDocument.get_motor_collection()
+    await collection.update_many({}, {"$unset": {"search_text": ""}})
+    logs, _ = await read_logs_search(LogSearchSchema(q="test_event"), repo)
+    assert len(logs) == 0
+
+    assert await backfill_search_text(batch_size=3) == len(test_create_log_list)
+    logs, _ = await read_logs_search(LogSearchSchema(q="test_event"), repo, limit=20)
+    assert len(logs) == len(test_create_log_list)
+
+
+@pytest.mark.asyncio
+async def test_timeseries_storage(test_log_schema: LogCreateSchema, mocker):
+    """
+    Test to verify that, in the time-series storage mode, the tenant and the level are stored as the meta field
+    and that the queries on them are translated accordingly.
+    """
+    from beanie import init_beanie
+    from mongomock_motor import AsyncMongoMockClient
+    from logs.schemas import LogSearchSchema
+    from repositories.mongo_repository import MongoTimeSeriesLogDocument
+
+    db = AsyncMongoMockClient()["test_timeseries_db"]
+    # mongomock does not support time-series collections, therefore a plain one stands for it
+    mocker.patch.object(MongoTimeSeriesLogDocument.Settings, "timeseries", None)
+    await init_beanie(database=db, document_models=[MongoTimeSeriesLogDocument])
+    repo = MongoLogRepository(MongoTimeSeriesLogDocument)
+
+    records = [
+        test_log_schema.model_dump(),
+        {
+            **test_log_schema.model_dump(),
+            "level": Level.ERROR,
+            "group_path": ["a", "b"],
+        },
+    ]
+    logs, failed = await create_logs(records, repo)
+    assert failed == {}
+
+    raw = await db[MongoTimeSeriesLogDocument.Settings.name].find_one(
+        {"uid": logs[1].uid}
+    )
+    assert raw["meta"] == {"tenant": "test_tenant", "level": "ERROR"}
+    assert "tenant" not in raw and "level" not in raw
+
+    log = await read_log(logs[1].uid, repo)
+    assert (log.tenant, log.level, log.group_path) == (
+        "test_tenant",
+        Level.ERROR,
+        ["a", "b"],
+    )
+
+    _, total = await read_logs_by_level(Level.ERROR, repo)
+    assert total == 1
+    logs, total = await read_logs_search(
+        LogSearchSchema(tenant="test_tenant", level=[Level.INFO]), repo
+    )
+    assert total == 1
+    _, total = await read_logs_by_group_path_children("a", repo)
+    assert total == 1
+
+
+@pytest.mark.asyncio
+async def test_read_stats(test_log_schema: LogCreateSchema, repo: MongoLogRepository):
+    """
+    Test to verify that the statistics are answered from the rollups maintained on every insert path.
+    """
+    from collections import Counter
+    from logs.stats import RollupGranularity
+
+    record = test_log_schema.model_dump()
+    await create_log(record, repo)
+    await create_logs(
+        [
+            {**record, "level": Level.ERROR, "group_path": ["root", "a"]},
+            {**record, "level": Level.ERROR, "tenant": "other"},
+            {**record, "level": Level.ERROR, "group_path": ["root"]},
+        ],
+        repo,
+    )
+
+    # the logs may fall in two consecutive buckets, therefore the counts are summed up
+    stats = await read_stats(repo)
+    assert sum(item["count"] for item in stats) == 4
+
+    by_level = Counter()
+    for item in await read_stats(repo, RollupGranularity.HOUR, by="level"):
+        by_level[item["key"]] += item["count"]
+    assert by_level == {"ERROR": 3, "INFO": 1}
+
+    stats = await read_stats(
+        repo, levels=[Level.ERROR], tenant="test_tenant", group_root="root"
+    )
+    assert sum(item["count"] for item in stats) == 2
+
+    with pytest.raises(HTTPException):
+        await read_stats(repo, since=datetime(2020, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_backfill_rollups(
+    test_log_schema: LogCreateSchema, repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the backfill job counts the logs stored while the rollups were disabled.
+    """
+    from datetime import timedelta
+    from repositories.backfill_rollups import backfill_rollups
+
+    mocker.patch("repositories.mongo_repository.settings.ROLLUPS_ENABLED", False)
+    await create_logs([test_log_schema.model_dump()] * 5, repo)
+    assert await read_stats(repo) == []
+
+    until = datetime.now() + timedelta(seconds=1)
+    assert await backfill_rollups(until, batch_size=2) == 5
+    stats = await read_stats(repo, until=until)
+    assert sum(item["count"] for item in stats) == 5
+
+
+async def test_export_logs(grouped_logs, repo: MongoLogRepository):
+    """
+    Test to verify that the export streams all the matching logs, newest first, as NDJSON, CSV or gzip.
+    """
+    import csv
+    import gzip
+    import json
+    from logs.export import ExportFormat
+    from logs.schemas import LogSearchSchema
+    from logs.services import export_logs
+
+    async def read(search, *args) -> bytes:
+        return b"".join([chunk async for chunk in export_logs(search, repo, *args)])
+
+    content = await read(LogSearchSchema(group="root-section-child"))
+    records = [json.loads(line) for line in content.decode().splitlines()]
+    assert len(records) == 2
+    assert [record["created_at"] for record in records] == sorted(
+        (record["created_at"] for record in records), reverse=True
+    )
+    assert set(records[0]) >= {"uid", "tenant", "level", "group_path", "log"}
+    assert "search_text" not in records[0]
+
+    content = await read(LogSearchSchema(), ExportFormat.CSV, True)
+    rows = list(csv.DictReader(gzip.decompress(content).decode().splitlines()))
+    assert len(rows) == len(grouped_logs)
+    assert {row["group_path"] for row in rows} >= {"root-section-child"}
+
+    with pytest.raises(HTTPException):
+        export_logs(
+            LogSearchSchema(since=datetime.now(), until=datetime(2024, 1, 1)), repo
+        )
+
+
+async def test_tail_logs(test_log_schema: LogCreateSchema, repo: MongoLogRepository):
+    """
+    Test to verify that the live tail streams the logs stored after the subscription as Server-Sent Events,
+    and that a response abandoned before it started does not subscribe.
+    """
+    import json
+    from logs.events import LogEventBus, get_event_bus
+    from logs.schemas import LogSearchSchema
+    from logs.services import tail_logs
+
+    bus = get_event_bus()
+    abandoned = tail_logs(LogSearchSchema(), bus)
+    del abandoned
+    events = tail_logs(LogSearchSchema(level=[Level.ERROR]), bus, heartbeat=0.01)
+    assert bus.subscribers == 0
+
+    assert await anext(events) == ": keep-alive\n\n"
+    assert bus.subscribers == 1
+    record = test_log_schema.model_dump()
+    await create_log({**record, "level": Level.INFO}, repo)
+    log = await create_log({**record, "level": Level.ERROR}, repo)
+    await create_logs([{**record, "level": Level.ERROR}], repo)
+
+    event = await anext(events)
+    assert event.startswith(f"id: {log.uid}\nevent: log\n")
+    assert json.loads(event.split("data: ", 1)[1])["uid"] == log.uid
+    assert "event: log" in await anext(events)
+    await events.aclose()
+    assert bus.subscribers == 0
+
+    with pytest.raises(HTTPException):
+        tail_logs(LogSearchSchema(), LogEventBus(max_subscribers=0))
+
+
+def test_search_hint():
+    """
+    Test to verify that searches hint the index of their most selective predicate.
+    """
+    from logs.filters import LogFilter
+    from repositories.mongo_repository import MongoLogDocument, _search_hint
+
+    declared = {index.document["name"] for index in MongoLogDocument.Settings.indexes}
+    hints = [
+        _search_hint(LogFilter(tenant="t", levels=[Level.ERROR], tag="tag")),
+        _search_hint(LogFilter(tenant="t", group_path=["root"])),
+        _search_hint(LogFilter(tenant="t", levels=[Level.ERROR])),
+        _search_hint(LogFilter(levels=[Level.ERROR])),
+        _search_hint(LogFilter(created_from=datetime.now())),
+    ]
+    assert hints == [
+        "tag_created_at",
+        "group_ancestors_created_at",
+        "tenant_created_at",
+        "level_created_at",
+        "created_at_uid",
+    ]
+    assert set(hints) <= declared
+
+
+async def test_search_hint_only_existing_indexes(
+    test_create_log_list: list[Log], monkeypatch
+):
+    """
+    Test to verify that searches only hint the indexes known to exist, such as while they are built in the background.
+    """
+    import repositories.mongo_repository as mongo_repository
+    from logs.filters import LogFilter
+    from repositories.indexes import sync_indexes
+    from repositories.mongo_repository import MongoLogDocument
+    from settings import settings
+
+    monkeypatch.setattr(settings, "SEARCH_INDEX_HINT", True)
+    monkeypatch.setattr(mongo_repository, "_available_indexes", {})
+    repo = MongoLogRepository(cache_results=False)
+    filters = LogFilter(tag="test_tag")
+    await MongoLogDocument.get_motor_collection().drop_index("tag_created_at")
+    await mongo_repository.refresh_available_indexes()
+
+    assert repo._search_kwargs(filters) == {}
+    logs, total = await repo.search(filters)
+    assert total == len(test_create_log_list)
+
+    await sync_indexes()
+    assert repo._search_kwargs(filters) == {"hint": "tag_created_at"}
 
 
 @pytest.mark.asyncio
@@ -175,3 +789,51 @@ async def test_create_log_non_blocking_connection_failure(
 
     # Optional: check that the raised error matches the expected exception
     assert exc_info.value.status_code == ServiceUnavailableError().error.status_code
+
+
+@pytest.mark.asyncio
+async def test_create_log_non_blocking_native_consumer(
+    test_log_schema: LogCreateSchema, mocker
+):
+    """
+    Test to verify that, with the native consumer, logs are published through the log queue instead of celery.
+    """
+    sample_record = test_log_schema.model_dump()
+    mocker.patch("logs.services.settings.MQ_CONSUMER", "native")
+    queue_mock = mocker.Mock()
+    queue_mock.enqueue_many = mocker.AsyncMock()
+    mocker.patch("logs.services.get_log_queue", return_value=queue_mock)
+    delay_mock = mocker.patch("tasks.create_log_task.delay")
+
+    celery_app_mock = mocker.Mock()
+    celery_app_mock.connection_or_acquire.return_value = mocker.MagicMock()
+
+    result = await create_log_non_blocking(sample_record, celery_app_mock)
+
+    queue_mock.enqueue_many.assert_awaited_once_with([sample_record])
+    delay_mock.assert_not_called()
+    assert result == sample_record
+
+
+@pytest.mark.asyncio
+async def test_create_log_non_blocking_fails_fast_when_broker_down(
+    test_log_schema: LogCreateSchema, mocker
+):
+    """
+    Test to verify that once the broker is known to be down, requests fail fast
+    without probing the broker again.
+    """
+    from fastapi import HTTPException
+
+    celery_app_mock = mocker.Mock()
+    context_manager_mock = mocker.MagicMock()
+    context_manager_mock.__enter__.side_effect = OperationalError()
+    celery_app_mock.connection_or_acquire.return_value = context_manager_mock
+    delay_mock = mocker.patch("tasks.create_log_task.delay")
+
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await create_log_non_blocking(test_log_schema.model_dump(), celery_app_mock)
+
+    celery_app_mock.connection_or_acquire.assert_called_once()
+    delay_mock.assert_not_called()
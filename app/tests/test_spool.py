@@ -0,0 +1,146 @@
+import pytest
+from fastapi import HTTPException
+from kombu.exceptions import OperationalError
+from logs.schemas import LogCreateSchema
+from logs.services import create_log_non_blocking
+from queues.spool import DiskSpool, SpoolReplayer
+from repositories.mongo_repository import MongoLogRepository
+
+
+@pytest.fixture
+def records(test_log_schema: LogCreateSchema) -> list[dict]:
+    return [test_log_schema.model_dump() | {"tag": f"tag_{i}"} for i in range(5)]
+
+
+def test_spool_append_and_rotate(tmp_path, records: list[dict]):
+    """
+    Test to verify that spooled logs are split into segments and are readable back in order.
+    """
+    spool = DiskSpool(directory=tmp_path, segment_size=100, fsync="always")
+    for record in records:
+        assert spool.append([record])
+    spool.seal()
+
+    segments = spool.sealed_segments()
+    assert len(segments) == len(records)
+    assert [r["tag"] for path in segments for r in spool.read_segment(path)] == [
+        r["tag"] for r in records
+    ]
+    assert spool.stats()["records"] == len(records)
+
+
+def test_spool_respects_quota(tmp_path, records: list[dict]):
+    """
+    Test to verify that the spool rejects logs once the disk quota would be exceeded.
+    """
+    spool = DiskSpool(directory=tmp_path, quota=300)
+
+    assert spool.append(records[:1])
+    assert not spool.append(records)
+    assert spool.stats()["records"] == 1
+    assert spool.stats()["rejected"] == len(records)
+
+
+def test_spool_survives_restart(tmp_path, records: list[dict]):
+    """
+    Test to verify that a new spool over the same directory picks up the previously spooled logs.
+    """
+    spool = DiskSpool(directory=tmp_path)
+    spool.append(records)
+    spool.seal()
+
+    assert DiskSpool(directory=tmp_path).stats()["records"] == len(records)
+
+
+async def test_replayer_drains_spool(tmp_path, records: list[dict], repo: MongoLogRepository):
+    """
+    Test to verify that the replayer writes the spooled logs to the repository and removes the drained segments.
+    """
+    spool = DiskSpool(directory=tmp_path)
+    spool.append(records)
+
+    await SpoolReplayer(spool, repo, batch_size=2).replay()
+
+    _, total = await repo.all()
+    assert total == len(records)
+    assert spool.stats()["records"] == 0
+    assert spool.stats()["bytes"] == 0
+
+
+async def test_replayer_keeps_segments_while_backend_down(
+    tmp_path, records: list[dict], repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the spooled logs are kept if the repository is not available.
+    """
+    spool = DiskSpool(directory=tmp_path)
+    spool.append(records)
+    mocker.patch.object(repo, "insert_many", side_effect=ConnectionError())
+
+    await SpoolReplayer(spool, repo).replay()
+
+    assert spool.stats()["records"] == len(records)
+
+
+async def test_non_blocking_falls_back_to_spool(
+    tmp_path, test_log_schema: LogCreateSchema, mocker
+):
+    """
+    Test to verify that the non-blocking path spools the log, instead of failing, when the broker is down.
+    """
+    spool = DiskSpool(directory=tmp_path)
+    mocker.patch("logs.services.get_spool", return_value=spool)
+    celery_app_mock = mocker.Mock()
+    context_manager_mock = mocker.MagicMock()
+    context_manager_mock.__enter__.side_effect = OperationalError()
+    celery_app_mock.connection_or_acquire.return_value = context_manager_mock
+
+    record = test_log_schema.model_dump()
+    assert await create_log_non_blocking(record, celery_app_mock) == record
+    assert spool.stats()["records"] == 1
+
+    mocker.patch("logs.services.get_spool", return_value=None)
+    with pytest.raises(HTTPException):
+        await create_log_non_blocking(record, celery_app_mock)
+
+
+async def test_replay_is_idempotent(
+    tmp_path, records: list[dict], repo: MongoLogRepository, mocker
+):
+    """
+    Test to verify that the logs spooled by the non-blocking path are stored once,
+    with their creation time, even if a replay fails halfway through a segment.
+    """
+    spool = DiskSpool(directory=tmp_path)
+    mocker.patch("logs.services.get_spool", return_value=spool)
+    celery_app_mock = mocker.Mock()
+    context_manager_mock = mocker.MagicMock()
+    context_manager_mock.__enter__.side_effect = OperationalError()
+    celery_app_mock.connection_or_acquire.return_value = context_manager_mock
+    for record in records:
+        await create_log_non_blocking(record, celery_app_mock)
+    spool.seal()
+    spooled = [r for path in spool.sealed_segments() for r in spool.read_segment(path)]
+    assert all(r["uid"] and r["created_at"] for r in spooled)
+
+    insert_many = repo.insert_many
+    calls = 0
+
+    async def fail_after_first_batch(logs):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise ConnectionError()
+        return await insert_many(logs)
+
+    mocker.patch.object(repo, "insert_many", side_effect=fail_after_first_batch)
+    await SpoolReplayer(spool, repo, batch_size=2).replay()
+    assert spool.stats()["records"] == len(records)
+
+    mocker.patch.object(repo, "insert_many", side_effect=insert_many)
+    await SpoolReplayer(spool, repo, batch_size=2).replay()
+
+    logs, total = await MongoLogRepository(cache_results=False).all(limit=10)
+    assert total == len(records)
+    assert {log.uid for log in logs} == {r["uid"] for r in spooled}
+    assert spool.stats()["records"] == 0
@@ -0,0 +1,47 @@
+import tasks
+from logs.schemas import LogCreateSchema
+from fastapi.encoders import jsonable_encoder
+
+
+def test_tasks_reuse_worker_loop(test_log_schema: LogCreateSchema, mocker):
+    """
+    Test to verify that the celery tasks share a single event loop and initialize the database only once.
+    """
+    init_db_mock = mocker.patch("tasks.init_db", new_callable=mocker.AsyncMock)
+    mocker.patch("tasks._loop", None)
+    record = jsonable_encoder(test_log_schema.model_dump())
+
+    tasks.create_log_task(record)
+    loop = tasks._loop
+    tasks.create_logs_batch_task([record, record, record])
+
+    assert tasks._loop is loop
+    init_db_mock.assert_awaited_once()
+    _, total = loop.run_until_complete(tasks.repo.all())
+    assert total == 4
+
+    tasks._shutdown_worker_process()
+    assert loop.is_closed()
+
+
+def test_tasks_retry_failed_initialization(test_log_schema: LogCreateSchema, mocker):
+    """
+    Test to verify that a task initializes the database again if it failed for a previous one.
+    """
+    init_db_mock = mocker.patch(
+        "tasks.init_db",
+        new_callable=mocker.AsyncMock,
+        side_effect=[ConnectionError(), None],
+    )
+    mocker.patch("tasks._loop", None)
+    record = jsonable_encoder(test_log_schema.model_dump())
+
+    tasks.create_log_task(record)
+    assert tasks._loop is None
+
+    tasks.create_log_task(record)
+    assert init_db_mock.await_count == 2
+    _, total = tasks._loop.run_until_complete(tasks.repo.all())
+    assert total == 1
+
+    tasks._shutdown_worker_process()